@@ -0,0 +1,149 @@
+# Measures the time spent parsing solution and project files.
+#
+# The project and solution files of the ProjectHierarchyTest solutions are copied
+# a number of times to a temporary folder. Each copy of a project file is made
+# larger by adding an ItemGroup with many Compile items and a long line, like the
+# embedded build targets found in real projects, and a reference to a project in
+# the same folder. The files are then parsed with
+# ProjectParser and with the line by line regular expressions used before it,
+# and the time per file is reported for both.
+#
+# Usage: python Benchmarks/ParserBenchmark.py [-s SCALE] [-i ITEMS] [-n RUNS]
+
+import argparse
+import glob
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+toolsFolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+fixtureFolder = os.path.join(toolsFolder, "ProjectHierarchyTest")
+sys.path.insert(0, toolsFolder)
+
+from ProjectParser import ParseSolutionFile, ParseProjectFile
+
+def LegacyParseSolutionFile(solutionFilename: str):
+    projects = []
+    f = open(solutionFilename)
+    line = f.readline()
+    line = f.readline()
+    while line:
+        match = re.match(r".*\".*\\(.*?\.csproj)\"", line, re.IGNORECASE)
+        if match:
+            projects.append(match.group(1))
+        line = f.readline()
+    f.close()
+    return {"Projects": projects}
+
+def LegacyParseProjectFile(projectFilename: str):
+    record = {"Packages": [], "RootNamespace": None, "TargetFramework": None, "ProjectReferences": []}
+    f = open(projectFilename)
+    line = f.readline()
+    while line:
+        match = re.match(r".*<(?:Package)?Reference Include=\"(.*?)\"?,? Version=\"?(.*?)(?:,|\")", line, re.IGNORECASE)
+        if match:
+            record["Packages"].append([match.group(1), match.group(2)])
+        else:
+            match = re.match(r".*<RootNamespace>(.*?)</RootNamespace>", line, re.IGNORECASE)
+            if match:
+                record["RootNamespace"] = match.group(1)
+            else:
+                match = re.match(r".*<(?:TargetFramework|TargetFrameworkVersion)>(.*?)</(?:TargetFramework|TargetFrameworkVersion)>", line, re.IGNORECASE)
+                if match:
+                    record["TargetFramework"] = match.group(1)
+                else:
+                    match = re.match(r".*ProjectReference Include=\"(.*)\\(.*?)\"", line, re.IGNORECASE)
+                    if match:
+                        record["ProjectReferences"].append([match.group(1), match.group(2)])
+        line = f.readline()
+    f.close()
+    return record
+
+# a project in the same folder, which the line by line parser did not recognize as a project reference
+sameFolderReference = "SameFolder.csproj"
+
+def InflateProject(content: str, items: int):
+    # Add an ItemGroup with the given number of Compile items, a reference to a project in the same folder
+    # and a long line before the end of the project
+    compileItems = "".join(f"    <Compile Include=\"Folder{i // 100}\\Class{i}.cs\" />\n" for i in range(items))
+    longLine = "    <Exec Command=\"" + " &amp;&amp; ".join(f"echo step{i}" for i in range(items)) + "\" />\n"
+    extra = f"  <ItemGroup>\n{compileItems}    <ProjectReference Include=\"{sameFolderReference}\" />\n  </ItemGroup>\n  <Target Name=\"AfterBuild\">\n{longLine}  </Target>\n"
+    position = content.rfind("</Project>")
+    return content[:position] + extra + content[position:]
+
+def GetExpectedRecord(projectFilename: str):
+    # The record of the line by line parser, with the reference to the project in the same folder it skipped
+    record = LegacyParseProjectFile(projectFilename)
+    record["ProjectReferences"].append(["", sameFolderReference])
+    return record
+
+def CreateWorkspace(workFolder: str, scale: int, items: int):
+    # Returns the names of the solution and project files written
+    solutionFilenames = []
+    projectFilenames = []
+    fixtureSolutions = glob.glob(os.path.join(fixtureFolder, "**", "*.sln"), recursive=True)
+    fixtureProjects = glob.glob(os.path.join(fixtureFolder, "**", "*.csproj"), recursive=True)
+    for copy in range(scale):
+        copyFolder = os.path.join(workFolder, f"Copy{copy}")
+        os.makedirs(copyFolder)
+        for i, fixtureFilename in enumerate(fixtureSolutions):
+            filename = os.path.join(copyFolder, f"{i}-{os.path.basename(fixtureFilename)}")
+            shutil.copyfile(fixtureFilename, filename)
+            solutionFilenames.append(filename)
+        for i, fixtureFilename in enumerate(fixtureProjects):
+            with open(fixtureFilename, encoding="utf-8-sig") as f:
+                content = f.read()
+            filename = os.path.join(copyFolder, f"{i}-{os.path.basename(fixtureFilename)}")
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(InflateProject(content, items))
+            projectFilenames.append(filename)
+    return solutionFilenames, projectFilenames
+
+def TimeParse(parse, filenames: list, runs: int):
+    # The best time of the runs for parsing all the files
+    bestTime = None
+    for run in range(runs):
+        start = time.perf_counter()
+        for filename in filenames:
+            parse(filename)
+        elapsed = time.perf_counter() - start
+        if bestTime is None or elapsed < bestTime:
+            bestTime = elapsed
+    return bestTime
+
+def main():
+    parser = argparse.ArgumentParser("python ParserBenchmark.py", description="Benchmark of parsing the solution and project files.")
+    parser.add_argument("-s", "--scale", default=50, help="Number of copies of the test solutions. Default: 50", type=int)
+    parser.add_argument("-i", "--items", default=500, help="Number of Compile items added to each project file. Default: 500", type=int)
+    parser.add_argument("-n", "--runs", default=3, help="Number of timed runs, the best run is reported. Default: 3", type=int)
+    args = parser.parse_args()
+
+    workFolder = tempfile.mkdtemp(prefix="parserbenchmark")
+    try:
+        solutionFilenames, projectFilenames = CreateWorkspace(workFolder, args.scale, args.items)
+        projectBytes = sum(os.path.getsize(filename) for filename in projectFilenames)
+        # the records of the two parsers must agree on the projects of the test solutions
+        mismatches = [filename for filename in projectFilenames if ParseProjectFile(filename) != GetExpectedRecord(filename)]
+        results = [
+            ("Solution files", len(solutionFilenames), TimeParse(LegacyParseSolutionFile, solutionFilenames, args.runs), TimeParse(ParseSolutionFile, solutionFilenames, args.runs)),
+            ("Project files", len(projectFilenames), TimeParse(LegacyParseProjectFile, projectFilenames, args.runs), TimeParse(ParseProjectFile, projectFilenames, args.runs)),
+        ]
+    finally:
+        shutil.rmtree(workFolder)
+
+    print(f"Project files:        {len(projectFilenames)} files, {projectBytes / len(projectFilenames) / 1024:.1f} KB per file")
+    print("")
+    print(f"{'':22}{'line by line':>14}{'ProjectParser':>15}{'speedup':>10}")
+    for name, count, legacyTime, parserTime in results:
+        print(f"{name:22}{legacyTime / count * 1e6:11.1f} us{parserTime / count * 1e6:12.1f} us{legacyTime / parserTime:9.1f}x")
+    print("")
+    if len(mismatches) > 0:
+        print(f"Records differ from the line by line parser for {len(mismatches)} files, e.g. {mismatches[0]}")
+    else:
+        print("Records are identical to the line by line parser")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Measures how the tools scale with the size of the workspace.
+#
+# A synthetic workspace is generated with WorkspaceGenerator, and every stage of
+# ProjectHierarchy.py is timed separately by the timers of Profiler: finding the
+# files, parsing them, linking the projects into the project model, generating
+# the markdown, dgml and GraphML documents, and writing all the files to disk.
+# With the profiler enabled each document is generated in memory before it is
+# written, so the generation and the writing of the files are timed separately.
+# ProjectFileStructure.py is timed as a separate process. The median of the runs
+# is reported for each stage together with the peak memory use, and the results
+# can be written as JSON to compare the tools between releases.
+#
+# Usage: python Benchmarks/PipelineBenchmark.py [-n RUNS] [-o RESULTS.json] [WORKSPACE PARAMETERS]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+toolsFolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, toolsFolder)
+
+import Profiler
+import ProjectHierarchy
+from WorkspaceGenerator import AddArguments, GetParameters, GenerateWorkspace
+
+# Bump this whenever the layout of the JSON results changes
+ResultsFormatVersion = 2
+
+stageNames = ["scan", "parse", "link", "render-md", "render-dgml", "render-graphml", "write", "filestructure"]
+
+def GetPeakMemory():
+    # The peak resident set size in KB of this process and of its finished child processes, or None
+    # when it cannot be measured on this platform
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    scale = 1024 if sys.platform == "darwin" else 1
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+
+def RunStages(function, *arguments):
+    # Calls a function of ProjectHierarchy.py and returns its result and the total time in seconds of
+    # each stage timed by the profiler during the call
+    Profiler.Reset()
+    result = function(*arguments)
+    return result, {name: total for name, (total, calls) in Profiler.timers.items()}
+
+def RunPipeline(root: str):
+    # Runs every stage once and returns the time of each stage in seconds
+    workspace, stageTimes = RunStages(ProjectHierarchy.scan_workspace, root)
+    times = {stageName: stageTimes[stageName] for stageName in ["scan", "parse", "link"]}
+
+    times["write"] = 0.0
+    renderStages = [
+        ("render-md", ProjectHierarchy.RenderOptions(projectReadmes=True, solutionReadmes=True)),
+        ("render-dgml", ProjectHierarchy.RenderOptions(directedGraphs=True, solutionReadmes=False)),
+        ("render-graphml", ProjectHierarchy.RenderOptions(graphML=True, solutionReadmes=False))
+    ]
+    for stageName, renderOptions in renderStages:
+        outputFilenames, stageTimes = RunStages(ProjectHierarchy.render_workspace, workspace, renderOptions, None, None, False, False)
+        writeTime = stageTimes.get("write files", 0.0)
+        renderTime = sum(total for name, total in stageTimes.items() if name.startswith("render "))
+        times[stageName] = renderTime - writeTime
+        times["write"] += writeTime
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(toolsFolder, "ProjectFileStructure.py"), "-f"], cwd=root, stdout=subprocess.DEVNULL, check=True)
+    times["filestructure"] = time.perf_counter() - start
+    return times, len(workspace.Projects), len(workspace.Index.SolutionFilenames), workspace.Index.GetCSharpFileCount(root)
+
+def main():
+    parser = argparse.ArgumentParser("python PipelineBenchmark.py", description="Benchmark of each stage of ProjectHierarchy.py and of ProjectFileStructure.py on a synthetic workspace.")
+    parser.add_argument("-n", "--runs", default=3, help="Number of timed runs, the median of each stage is reported. Default: 3", type=int)
+    parser.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file, or to the console when '-'", type=str)
+    parser.add_argument("-k", "--keep", default=None, help="Generate the workspace in this folder and keep it after the benchmark", type=str)
+    AddArguments(parser)
+    args = parser.parse_args()
+
+    parameters = GetParameters(args)
+    Profiler.Enable()
+    if args.keep is not None:
+        workFolder = args.keep
+        os.makedirs(workFolder, exist_ok=True)
+    else:
+        workFolder = tempfile.mkdtemp(prefix="pipelinebenchmark")
+    try:
+        start = time.perf_counter()
+        filesGenerated = GenerateWorkspace(workFolder, parameters)
+        generateTime = time.perf_counter() - start
+        runs = []
+        for run in range(args.runs):
+            times, projectCount, solutionCount, csharpFileCount = RunPipeline(workFolder)
+            runs.append(times)
+    finally:
+        if args.keep is None:
+            shutil.rmtree(workFolder)
+    peakMemory, peakChildMemory = GetPeakMemory()
+
+    stages = {}
+    for stageName in stageNames:
+        stageTimes = [times[stageName] for times in runs]
+        stages[stageName] = {"median": statistics.median(stageTimes), "min": min(stageTimes), "max": max(stageTimes)}
+    results = {
+        "formatVersion": ResultsFormatVersion,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters.ToDictionary(),
+        "workspace": {"files": filesGenerated, "solutions": solutionCount, "projects": projectCount, "csharpFiles": csharpFileCount, "generateSeconds": generateTime},
+        "runs": args.runs,
+        "stages": stages,
+        "totalSeconds": sum(stages[stageName]["median"] for stageName in stageNames if stageName != "filestructure"),
+        "peakRssKb": peakMemory,
+        "peakChildRssKb": peakChildMemory
+    }
+
+    if args.output == "-":
+        print(json.dumps(results, indent=1))
+        return
+    print(f"Workspace:            {solutionCount} solutions, {projectCount} projects, {csharpFileCount} C# files, {filesGenerated} files generated in {generateTime:.1f} s")
+    print(f"Runs:                 {args.runs}")
+    print("")
+    print(f"{'Stage':22}{'median':>12}{'min':>12}")
+    for stageName in stageNames:
+        print(f"{stageName:22}{stages[stageName]['median'] * 1000:9.1f} ms{stages[stageName]['min'] * 1000:9.1f} ms")
+    print(f"{'total (in process)':22}{results['totalSeconds'] * 1000:9.1f} ms")
+    print("")
+    if peakMemory is not None:
+        print(f"Peak RSS:             {peakMemory / 1024:.1f} MB, ProjectFileStructure.py: {peakChildMemory / 1024:.1f} MB")
+    else:
+        print("Peak RSS:             not available on this platform")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Measures the startup cost of ProjectHierarchy.py.
+#
+# The tool is run on a copy of the ProjectHierarchyTest solutions, once with
+# 'python -X importtime' to list the imported modules and then a number of times
+# to measure the wall time of the whole run. When the tool is run without
+# arguments, the benchmark fails if one of the heavy modules that are only needed
+# by some of the parameters is imported.
+#
+# Usage: python Benchmarks/StartupBenchmark.py [-n RUNS] [-a="TOOL ARGUMENTS"]
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+toolsFolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+toolFilename = os.path.join(toolsFolder, "ProjectHierarchy.py")
+fixtureFolder = os.path.join(toolsFolder, "ProjectHierarchyTest")
+
+# modules that must not be imported when only the markdown files are generated
+heavyModules = ['pydot', 'pyparsing', 'sqlite3', 'concurrent.futures', 'multiprocessing', 'subprocess', 'xml.etree.ElementTree']
+
+def ParseImportTimes(output: str):
+    # Returns (module, self time, cumulative time, nesting level) for each line of the -X importtime output
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        selfTime, cumulativeTime, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(selfTime), int(cumulativeTime), level))
+    return imports
+
+def main():
+    parser = argparse.ArgumentParser("python StartupBenchmark.py", description="Benchmark of the startup time and the imported modules of ProjectHierarchy.py.")
+    parser.add_argument("-n", "--runs", default=10, help="Number of timed runs. Default: 10", type=int)
+    parser.add_argument("-a", "--arguments", default="", help="Arguments passed to ProjectHierarchy.py, for example -a=\"-ph -img\"", type=str)
+    parser.add_argument("-t", "--top", default=10, help="Number of the slowest imports to show. Default: 10", type=int)
+    args = parser.parse_args()
+
+    toolArguments = args.arguments.split()
+    workFolder = tempfile.mkdtemp(prefix="startupbenchmark")
+    try:
+        solutionFolder = os.path.join(workFolder, "ProjectHierarchyTest")
+        shutil.copytree(fixtureFolder, solutionFolder)
+        command = [sys.executable, toolFilename] + toolArguments
+
+        result = subprocess.run([sys.executable, "-X", "importtime", toolFilename] + toolArguments, cwd=solutionFolder, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+        imports = ParseImportTimes(result.stderr)
+        importedModules = set(name for name, selfTime, cumulativeTime, level in imports)
+        totalImportTime = sum(selfTime for name, selfTime, cumulativeTime, level in imports)
+
+        wallTimes = []
+        for run in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=solutionFolder, stdout=subprocess.DEVNULL, check=True)
+            wallTimes.append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(workFolder)
+
+    print(f"Arguments:            {' '.join(toolArguments)}")
+    print(f"Modules imported:     {len(importedModules)}")
+    print(f"Total import time:    {totalImportTime / 1000:.1f} ms")
+    print(f"Wall time (median):   {statistics.median(wallTimes) * 1000:.1f} ms over {args.runs} runs")
+    print(f"Wall time (min):      {min(wallTimes) * 1000:.1f} ms")
+    print("")
+    print("Slowest top level imports (cumulative):")
+    topLevelImports = sorted([entry for entry in imports if entry[3] == 0], key=lambda entry: entry[2], reverse=True)
+    for name, selfTime, cumulativeTime, level in topLevelImports[:args.top]:
+        print(f"  {cumulativeTime / 1000:8.1f} ms  {name}")
+    print("")
+    heavyModulesImported = [module for module in heavyModules if module in importedModules]
+    if len(heavyModulesImported) > 0:
+        print(f"Heavy modules imported: {', '.join(heavyModulesImported)}")
+        if len(toolArguments) == 0:
+            sys.exit(1)
+    else:
+        print("No heavy modules imported")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Generates synthetic C# workspaces for benchmarking the tools.
+#
+# The projects are arranged in levels: every project references a number of
+# projects (the fan-in) on the level below it, so the same projects are reached
+# through several paths, like the diamond shaped dependencies of real solutions.
+# The projects are spread over the solutions and placed in nested folders, and
+# every fourth project is a legacy project with a packages.config file. The
+# output only depends on the parameters and the seed.
+#
+# Usage: python Benchmarks/WorkspaceGenerator.py FOLDER [-p PROJECTS] [-s SOLUTIONS] ...
+
+import argparse
+import os
+import random
+
+class WorkspaceParameters:
+    __slots__ = ("Solutions", "Projects", "Packages", "PackagesPerProject", "CSharpFiles", "ReferenceDepth", "FanIn", "DirectoryDepth", "Seed")
+
+    def __init__(self, solutions: int = 5, projects: int = 200, packages: int = 50, packagesPerProject: int = 5, csharpFiles: int = 20, referenceDepth: int = 6, fanIn: int = 3, directoryDepth: int = 2, seed: int = 1):
+        self.Solutions = solutions
+        self.Projects = projects
+        # the number of different packages and the number used by each project
+        self.Packages = packages
+        self.PackagesPerProject = packagesPerProject
+        # the number of .cs files in each project
+        self.CSharpFiles = csharpFiles
+        # the number of levels of project references and the number of projects on the level below referenced by each project
+        self.ReferenceDepth = referenceDepth
+        self.FanIn = fanIn
+        # the number of folders between the solution folder and the project folders
+        self.DirectoryDepth = directoryDepth
+        self.Seed = seed
+
+    def ToDictionary(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def AddArguments(parser: argparse.ArgumentParser):
+    # Add the workspace parameters to the command line arguments of a tool
+    defaults = WorkspaceParameters()
+    parser.add_argument("-s", "--solutions", default=defaults.Solutions, help=f"Number of solutions. Default: {defaults.Solutions}", type=int)
+    parser.add_argument("-p", "--projects", default=defaults.Projects, help=f"Number of projects. Default: {defaults.Projects}", type=int)
+    parser.add_argument("--packages", default=defaults.Packages, help=f"Number of different packages. Default: {defaults.Packages}", type=int)
+    parser.add_argument("--packagesperproject", default=defaults.PackagesPerProject, help=f"Number of packages used by each project. Default: {defaults.PackagesPerProject}", type=int)
+    parser.add_argument("--csharpfiles", default=defaults.CSharpFiles, help=f"Number of .cs files in each project. Default: {defaults.CSharpFiles}", type=int)
+    parser.add_argument("--depth", default=defaults.ReferenceDepth, help=f"Number of levels of project references. Default: {defaults.ReferenceDepth}", type=int)
+    parser.add_argument("--fanin", default=defaults.FanIn, help=f"Number of projects on the level below referenced by each project. Default: {defaults.FanIn}", type=int)
+    parser.add_argument("--directorydepth", default=defaults.DirectoryDepth, help=f"Number of folders between a solution folder and its project folders. Default: {defaults.DirectoryDepth}", type=int)
+    parser.add_argument("--seed", default=defaults.Seed, help=f"Seed of the random generator. Default: {defaults.Seed}", type=int)
+
+def GetParameters(args):
+    return WorkspaceParameters(args.solutions, args.projects, args.packages, args.packagesperproject, args.csharpfiles, args.depth, args.fanin, args.directorydepth, args.seed)
+
+def GenerateSdkProject(packages: list, references: list):
+    lines = ["<Project Sdk=\"Microsoft.NET.Sdk\">\n", "  <PropertyGroup>\n", "    <TargetFramework>net8.0</TargetFramework>\n", "  </PropertyGroup>\n", "  <ItemGroup>\n"]
+    for package, version in packages:
+        lines.append(f"    <PackageReference Include=\"{package}\" Version=\"{version}\" />\n")
+    lines.append("  </ItemGroup>\n  <ItemGroup>\n")
+    for reference in references:
+        lines.append(f"    <ProjectReference Include=\"{reference}\" />\n")
+    lines.append("  </ItemGroup>\n</Project>\n")
+    return "".join(lines)
+
+def GenerateLegacyProject(projectName: str, packages: list, references: list, csharpFilenames: list):
+    lines = ["<?xml version=\"1.0\" encoding=\"utf-8\"?>\n", "<Project ToolsVersion=\"15.0\" xmlns=\"http://schemas.microsoft.com/developer/msbuild/2003\">\n", "  <PropertyGroup>\n",
+             f"    <RootNamespace>{projectName}</RootNamespace>\n", "    <TargetFrameworkVersion>v4.7.2</TargetFrameworkVersion>\n", "  </PropertyGroup>\n", "  <ItemGroup>\n"]
+    for package, version in packages:
+        lines.append(f"    <Reference Include=\"{package}, Version={version}.0, Culture=neutral, PublicKeyToken=null\">\n")
+        lines.append(f"      <HintPath>..\\packages\\{package}.{version}\\lib\\net45\\{package}.dll</HintPath>\n    </Reference>\n")
+    lines.append("    <Reference Include=\"System\" />\n  </ItemGroup>\n  <ItemGroup>\n")
+    for csharpFilename in csharpFilenames:
+        lines.append(f"    <Compile Include=\"{csharpFilename}\" />\n")
+    lines.append("  </ItemGroup>\n  <ItemGroup>\n")
+    for reference in references:
+        lines.append(f"    <ProjectReference Include=\"{reference}\">\n      <Name>{os.path.basename(reference)}</Name>\n    </ProjectReference>\n")
+    lines.append("  </ItemGroup>\n  <Import Project=\"$(MSBuildToolsPath)\\Microsoft.CSharp.targets\" />\n</Project>\n")
+    return "".join(lines)
+
+def GeneratePackagesConfig(packages: list):
+    lines = ["<?xml version=\"1.0\" encoding=\"utf-8\"?>\n", "<packages>\n"]
+    for package, version in packages:
+        lines.append(f"  <package id=\"{package}\" version=\"{version}\" targetFramework=\"net472\" />\n")
+    lines.append("</packages>\n")
+    return "".join(lines)
+
+def GenerateSolution(projects: list):
+    # projects holds (project name, path relative to the solution folder) pairs
+    lines = ["\ufeff\n", "Microsoft Visual Studio Solution File, Format Version 12.00\n"]
+    for i, (projectName, projectPath) in enumerate(projects):
+        lines.append(f"Project(\"{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}\") = \"{projectName}\", \"{projectPath}\", \"{{00000000-0000-0000-0000-{i:012d}}}\"\nEndProject\n")
+    lines.append("Global\nEndGlobal\n")
+    return "".join(lines)
+
+def WriteText(filename: str, content: str):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(content)
+
+def GenerateWorkspace(folder: str, parameters: WorkspaceParameters):
+    # Writes the workspace to the folder and returns the number of files written
+    randomGenerator = random.Random(parameters.Seed)
+    levels = max(1, parameters.ReferenceDepth + 1)
+    packageNames = [f"Synthetic.Package{i}" for i in range(parameters.Packages)]
+    # the folder of each project relative to the workspace folder, and the projects on each level
+    projectFolders = []
+    projectsOnLevel = [[] for level in range(levels)]
+    for i in range(parameters.Projects):
+        solution = i % max(1, parameters.Solutions)
+        groups = [f"Group{(i // (10 ** (depth + 1))) % 10}" for depth in range(parameters.DirectoryDepth)]
+        projectFolders.append(os.path.join(f"Solution{solution}", *groups, f"Project{i}"))
+        projectsOnLevel[i % levels].append(i)
+
+    filesWritten = 0
+    solutionProjects = [[] for solution in range(max(1, parameters.Solutions))]
+    for i in range(parameters.Projects):
+        projectName = f"Project{i}"
+        level = i % levels
+        references = []
+        if level > 0 and len(projectsOnLevel[level - 1]) > 0:
+            referenced = randomGenerator.sample(projectsOnLevel[level - 1], min(parameters.FanIn, len(projectsOnLevel[level - 1])))
+            references = [os.path.relpath(os.path.join(projectFolders[j], f"Project{j}.csproj"), projectFolders[i]).replace("/", "\\") for j in sorted(referenced)]
+        # a few versions of each package, so the package matrix shows mismatches
+        packages = [(package, f"{1 + randomGenerator.randrange(3)}.{randomGenerator.randrange(2)}.0") for package in randomGenerator.sample(packageNames, min(parameters.PackagesPerProject, len(packageNames)))]
+        csharpFilenames = [os.path.join(f"Folder{j % 4}", f"Class{j}.cs") for j in range(parameters.CSharpFiles)]
+        projectFolder = os.path.join(folder, projectFolders[i])
+        if i % 4 == 3:
+            WriteText(os.path.join(projectFolder, f"{projectName}.csproj"), GenerateLegacyProject(projectName, packages, references, [filename.replace("/", "\\") for filename in csharpFilenames]))
+            WriteText(os.path.join(projectFolder, "packages.config"), GeneratePackagesConfig(packages))
+            filesWritten += 2
+        else:
+            WriteText(os.path.join(projectFolder, f"{projectName}.csproj"), GenerateSdkProject(packages, references))
+            filesWritten += 1
+        for j, csharpFilename in enumerate(csharpFilenames):
+            WriteText(os.path.join(projectFolder, csharpFilename), f"namespace {projectName}\n{{\n    public class Class{j}\n    {{\n    }}\n}}\n")
+        filesWritten += len(csharpFilenames)
+        solutionFolder = projectFolders[i].split(os.sep)[0]
+        solutionProjects[i % len(solutionProjects)].append((projectName, os.path.relpath(os.path.join(projectFolders[i], f"{projectName}.csproj"), solutionFolder).replace("/", "\\")))
+    for solution, projects in enumerate(solutionProjects):
+        WriteText(os.path.join(folder, f"Solution{solution}", f"Solution{solution}.sln"), GenerateSolution(projects))
+        filesWritten += 1
+    return filesWritten
+
+def main():
+    parser = argparse.ArgumentParser("python WorkspaceGenerator.py", description="Generates a synthetic workspace of C# solutions and projects.")
+    parser.add_argument("folder", help="The folder the workspace is written to", type=str)
+    AddArguments(parser)
+    args = parser.parse_args()
+    if os.path.exists(args.folder) and len(os.listdir(args.folder)) > 0:
+        print(f"The folder {args.folder} is not empty")
+        exit()
+    filesWritten = GenerateWorkspace(args.folder, GetParameters(args))
+    print(f"{filesWritten} files written to {args.folder}")
+
+if __name__ == "__main__":
+    main()
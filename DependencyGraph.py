@@ -0,0 +1,180 @@
+# The project reference graph of the projects in the workspace.
+#
+# The graph is built once from the parsed projects. The projects are sorted
+# topologically, so results computed for a project can be reused by every
+# project that references it instead of walking the same subprojects again.
+
+class ProjectCycleError(Exception):
+    def __init__(self, cycle: list):
+        super().__init__(" -> ".join(cycle))
+        self.Cycle = cycle
+
+class DependencyGraph:
+    def __init__(self, projectDictionary: dict):
+        # The names of the projects referenced by each project, in the order they are referenced
+        self.Children = {}
+        for projectName in projectDictionary:
+            self.Children[projectName] = [subProject.ProjectName for subProject in projectDictionary[projectName].SubProjects]
+        # Every project comes after all the projects it references
+        self.TopologicalOrder = self._SortTopologically()
+        self._parents = None
+        self._nodes = None
+        self._links = None
+        # The transitive dependencies and dependents of each project as bitsets, where bit i stands
+        # for the project at position i in the topological order
+        self._bitIndex = {projectName: i for i, projectName in enumerate(self.TopologicalOrder)}
+        self._dependencyBits = None
+        self._dependentBits = None
+        self._levels = None
+
+    def _SortTopologically(self):
+        order = []
+        visiting = set()
+        done = set()
+        for rootName in self.Children:
+            if rootName in done:
+                continue
+            path = [rootName]
+            visiting.add(rootName)
+            stack = [iter(self.Children[rootName])]
+            while stack:
+                childName = next(stack[-1], None)
+                if childName is None:
+                    stack.pop()
+                    projectName = path.pop()
+                    visiting.remove(projectName)
+                    done.add(projectName)
+                    order.append(projectName)
+                elif childName in visiting:
+                    raise ProjectCycleError(path[path.index(childName):] + [childName])
+                elif childName not in done:
+                    path.append(childName)
+                    visiting.add(childName)
+                    stack.append(iter(self.Children[childName]))
+        return order
+
+    def ComputeBottomUp(self, compute, previousResults: dict = None, affected: set = None):
+        # Calls compute(projectName, results) for every project, after it has been called for all the
+        # projects it references, and returns the results of all the calls by project name.
+        # When previousResults is given, compute is only called for the affected projects and for
+        # projects without a previous result; the previous results are used for the other projects.
+        results = {}
+        for projectName in self.TopologicalOrder:
+            if previousResults is not None and projectName not in affected and projectName in previousResults:
+                results[projectName] = previousResults[projectName]
+            else:
+                results[projectName] = compute(projectName, results)
+        return results
+
+    def ReverseClosure(self, projectNames):
+        # The given projects and all the projects that depend on them, directly or indirectly
+        if self._parents is None:
+            self._parents = {projectName: [] for projectName in self.Children}
+            for projectName in self.Children:
+                for childName in self.Children[projectName]:
+                    self._parents[childName].append(projectName)
+        closure = set()
+        stack = [projectName for projectName in projectNames if projectName in self.Children]
+        while stack:
+            projectName = stack.pop()
+            if projectName not in closure:
+                closure.add(projectName)
+                stack.extend(self._parents[projectName])
+        return closure
+
+    def ReuseResults(self, previousGraph, affected: set):
+        # Take over the nodes and links computed by the graph of a previous version of the workspace.
+        # Only the projects in affected, which must contain every project whose references changed and
+        # every project depending on them, are computed again.
+        if previousGraph._nodes is not None:
+            self._nodes = self.ComputeBottomUp(self._CollectNodes, previousGraph._nodes, affected)
+        if previousGraph._links is not None:
+            self._links = self.ComputeBottomUp(self._CollectLinks, previousGraph._links, affected)
+
+    def _NamesOfBits(self, bits: int):
+        # The projects of the bits that are set, in topological order
+        names = []
+        while bits:
+            lowestBit = bits & -bits
+            names.append(self.TopologicalOrder[lowestBit.bit_length() - 1])
+            bits ^= lowestBit
+        return names
+
+    def _ComputeDependencyBits(self, projectName: str, results: dict):
+        bits = 0
+        for childName in self.Children[projectName]:
+            bits |= results[childName] | (1 << self._bitIndex[childName])
+        return bits
+
+    def Dependencies(self, projectName: str):
+        # All the projects the project depends on, directly or indirectly, in build order
+        if self._dependencyBits is None:
+            self._dependencyBits = self.ComputeBottomUp(self._ComputeDependencyBits)
+        return self._NamesOfBits(self._dependencyBits[projectName])
+
+    def Dependents(self, projectName: str):
+        # All the projects depending on the project, directly or indirectly, in build order
+        if self._dependentBits is None:
+            # the projects depending on a project come after it in the topological order, so they are done first
+            self._dependentBits = {projectName: 0 for projectName in self.TopologicalOrder}
+            for parentName in reversed(self.TopologicalOrder):
+                parentBits = self._dependentBits[parentName] | (1 << self._bitIndex[parentName])
+                for childName in self.Children[parentName]:
+                    self._dependentBits[childName] |= parentBits
+        return self._NamesOfBits(self._dependentBits[projectName])
+
+    def DependsOn(self, projectName: str, dependencyName: str):
+        # True if the project depends on the other project, directly or indirectly
+        if self._dependencyBits is None:
+            self._dependencyBits = self.ComputeBottomUp(self._ComputeDependencyBits)
+        return (self._dependencyBits[projectName] >> self._bitIndex[dependencyName]) & 1 == 1
+
+    def _ComputeLevel(self, projectName: str, results: dict):
+        return max((results[childName] + 1 for childName in self.Children[projectName]), default=0)
+
+    def BuildLevel(self, projectName: str):
+        # The number of projects on the longest chain of project references below the project. All the
+        # projects on the same level can be built in parallel once the lower levels have been built.
+        if self._levels is None:
+            self._levels = self.ComputeBottomUp(self._ComputeLevel)
+        return self._levels[projectName]
+
+    def BuildLevels(self, projectNames=None):
+        # The projects, or the given projects, grouped by build level, lowest level first. The number of
+        # levels is the length of the critical path of a parallel build.
+        if projectNames is None:
+            projectNames = self.TopologicalOrder
+        levels = []
+        for projectName in projectNames:
+            level = self.BuildLevel(projectName)
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(projectName)
+        return [level for level in levels if len(level) > 0]
+
+    def Nodes(self, projectName: str):
+        # The project and all the projects it depends on, in the order they are first found
+        # when following the project references depth first
+        if self._nodes is None:
+            self._nodes = self.ComputeBottomUp(self._CollectNodes)
+        return self._nodes[projectName].keys()
+
+    def Links(self, projectName: str):
+        # The (source, target) project references found when following the project references
+        # depth first from the project, without duplicates
+        if self._links is None:
+            self._links = self.ComputeBottomUp(self._CollectLinks)
+        return self._links[projectName].keys()
+
+    def _CollectNodes(self, projectName: str, results: dict):
+        nodes = {projectName: None}
+        for childName in self.Children[projectName]:
+            nodes.update(results[childName])
+        return nodes
+
+    def _CollectLinks(self, projectName: str, results: dict):
+        links = {}
+        for childName in self.Children[projectName]:
+            links[(projectName, childName)] = None
+            links.update(results[childName])
+        return links
@@ -0,0 +1,75 @@
+# Rendering of project graphs to images using Graphviz.
+#
+# The graphs are collected first and rendered afterwards by a bounded pool of
+# concurrent 'dot' processes. The hash of the source of every rendered graph is
+# kept in a manifest file, so images whose graph did not change since the last
+# run are not rendered again.
+
+import hashlib
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import pydot
+
+def GenerateDotSource(links: list):
+    graph = pydot.Dot(graph_type='digraph')
+    for link in links:
+        edge = pydot.Edge(link[0], link[1])
+        graph.add_edge(edge)
+    return graph.to_string()
+
+class ImageRenderer:
+    def __init__(self, dotExecutable: str, outputFormat: str, jobs: int, manifestFilename: str, verbose: bool):
+        self.DotExecutable = dotExecutable
+        self.Verbose = verbose
+        self.OutputFormat = outputFormat
+        self.Jobs = jobs
+        self.ManifestFilename = manifestFilename
+        self.Rendered = 0
+        self.Unchanged = 0
+        self.Failed = 0
+        self.RenderedFilenames = []
+        self._graphs = []
+
+    def Add(self, outputFilename: str, links: list):
+        self._graphs.append((outputFilename, GenerateDotSource(links)))
+
+    def Render(self):
+        manifest = {}
+        if os.path.exists(self.ManifestFilename):
+            with open(self.ManifestFilename) as f:
+                manifest = json.load(f)
+        pending = []
+        for outputFilename, source in self._graphs:
+            sourceHash = hashlib.sha1(f"{self.OutputFormat}\n{source}".encode("utf-8")).hexdigest()
+            if manifest.get(outputFilename) == sourceHash and os.path.exists(outputFilename):
+                self.Unchanged += 1
+            else:
+                pending.append((outputFilename, source, sourceHash))
+        with ThreadPoolExecutor(max_workers=self.Jobs) as executor:
+            results = executor.map(lambda graph: self._RenderGraph(graph[0], graph[1]), pending)
+            for (outputFilename, source, sourceHash), succeeded in zip(pending, results):
+                if succeeded:
+                    self.Rendered += 1
+                    self.RenderedFilenames.append(outputFilename)
+                    manifest[outputFilename] = sourceHash
+                else:
+                    self.Failed += 1
+                    manifest.pop(outputFilename, None)
+        manifestFolder = os.path.dirname(self.ManifestFilename)
+        if manifestFolder:
+            os.makedirs(manifestFolder, exist_ok=True)
+        with open(self.ManifestFilename, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        self._graphs = []
+
+    def _RenderGraph(self, outputFilename: str, source: str):
+        if self.Verbose:
+            print(f"Generating image: {outputFilename}")
+        result = subprocess.run([self.DotExecutable, f"-T{self.OutputFormat}", "-o", outputFilename], input=source.encode("utf-8"), stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            print(f"Error generating image: {outputFilename}")
+            print(result.stderr.decode("utf-8", "replace"))
+            return False
+        return True
@@ -0,0 +1,53 @@
+# Index of the packages used by the projects in the workspace.
+#
+# For every package the index holds the versions used and the projects using
+# each version, so questions like "which projects use package X" or "which
+# packages are used in more than one version" are answered by a dictionary
+# lookup instead of going through the packages of every project. Package names
+# are compared case insensitively, like NuGet does.
+
+def VersionKey(version: str):
+    # Sort key that orders versions like 1.2.10 after 1.2.9
+    key = []
+    for part in version.replace("-", ".").split("."):
+        if part.isdigit():
+            key.append((0, int(part), ""))
+        else:
+            key.append((1, 0, part))
+    return key
+
+class PackageIndex:
+    def __init__(self):
+        # The name of each package as first found, by lower case name
+        self.Names = {}
+        # The projects using each version of each package by lower case name. The projects are kept as
+        # the keys of a dictionary, which keeps them in the order they were added without duplicates.
+        self._versions = {}
+
+    def Add(self, package: str, version: str, projectName: str):
+        # Returns the name the package is indexed by, which is the name it was first found with
+        key = package.lower()
+        if key not in self._versions:
+            self.Names[key] = package
+            self._versions[key] = {}
+        versions = self._versions[key]
+        if version not in versions:
+            versions[version] = {}
+        versions[version][projectName] = None
+        return self.Names[key]
+
+    def GetUsages(self, package: str):
+        # The names of the projects using each version of the package, ordered by version, or
+        # None if no project uses the package
+        versions = self._versions.get(package.lower())
+        if versions is None:
+            return None
+        return {version: list(versions[version]) for version in sorted(versions, key=VersionKey)}
+
+    def GetConflicts(self):
+        # (package, usages) for each package used in more than one version, ordered by package name
+        conflicts = []
+        for key in sorted(self._versions):
+            if len(self._versions[key]) > 1:
+                conflicts.append((self.Names[key], self.GetUsages(key)))
+        return conflicts
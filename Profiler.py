@@ -0,0 +1,106 @@
+# Timers and counters for finding out where the time of a run goes.
+#
+# The stages of a run are timed with 'with Profiler.Stage("name"):' and events
+# are counted with Profiler.Count("name", amount). Both do nothing until Enable()
+# is called: Stage returns a shared object that does nothing and Count returns at
+# once, so the calls can stay in the code. Counts made in other processes, for
+# example when parsing with several processes, are not included.
+
+import time
+
+enabled = False
+# The total time in seconds and the number of calls of each stage, and the value of each counter,
+# in the order they were first used
+timers = {}
+counters = {}
+# (stage, start, duration) of every timed stage, in seconds since Enable() was called
+trace = []
+startTime = 0.0
+
+def Enable():
+    global enabled, startTime
+    enabled = True
+    startTime = time.perf_counter()
+
+def Reset():
+    # Clears the timers, the counters and the trace, for example between the runs of a benchmark
+    global startTime
+    timers.clear()
+    counters.clear()
+    trace.clear()
+    startTime = time.perf_counter()
+
+class StageTimer:
+    __slots__ = ("Name", "Start")
+
+    def __init__(self, name: str):
+        self.Name = name
+        self.Start = 0.0
+
+    def __enter__(self):
+        self.Start = time.perf_counter()
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        duration = time.perf_counter() - self.Start
+        timer = timers.get(self.Name)
+        if timer is None:
+            timers[self.Name] = [duration, 1]
+        else:
+            timer[0] += duration
+            timer[1] += 1
+        trace.append((self.Name, self.Start - startTime, duration))
+        return False
+
+class DisabledTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        return False
+
+disabledTimer = DisabledTimer()
+
+def Stage(name: str):
+    # Times the code in a with block as the named stage
+    if not enabled:
+        return disabledTimer
+    return StageTimer(name)
+
+def Count(name: str, amount: int = 1):
+    if not enabled:
+        return
+    counters[name] = counters.get(name, 0) + amount
+
+def GenerateSummary():
+    # The lines of a table with the time of each stage and a table with the counters
+    wallTime = time.perf_counter() - startTime
+    nameWidth = max([len(name) for name in list(timers) + list(counters)] + [len("Stage")])
+    yield f"{'Stage':{nameWidth}}  {'calls':>7}  {'total ms':>10}  {'% of run':>8}\n"
+    for name, (total, calls) in timers.items():
+        yield f"{name:{nameWidth}}  {calls:7}  {total * 1000:10.1f}  {total / wallTime * 100:7.1f}%\n"
+    yield f"{'Run':{nameWidth}}  {1:7}  {wallTime * 1000:10.1f}  {100:7.1f}%\n"
+    if len(counters) > 0:
+        yield "\n"
+        yield f"{'Counter':{nameWidth}}  {'value':>10}\n"
+        for name, value in counters.items():
+            yield f"{name:{nameWidth}}  {value:10}\n"
+
+def WriteTrace(filename: str):
+    # Writes the timed stages in the Trace Event format, which can be opened in chrome://tracing or
+    # https://ui.perfetto.dev, with the totals and the counters in otherData
+    import json
+    import os
+    events = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": os.getpid(), "tid": 0} for name, start, duration in trace]
+    otherData = {
+        "wallTimeMs": (time.perf_counter() - startTime) * 1000,
+        "stages": {name: {"totalMs": total * 1000, "calls": calls} for name, (total, calls) in timers.items()},
+        "counters": counters
+    }
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(filename, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": otherData}, f, indent=1)
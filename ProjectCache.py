@@ -0,0 +1,92 @@
+# Persistent cache of parsed solution and project files.
+#
+# The records returned by ProjectParser are stored in a SQLite database together
+# with the modification time and size of the file they were parsed from. When the
+# file has not changed since the last run the record is served from the cache
+# instead of parsing the file again. Optionally the content hash of the file is
+# stored as well and used to validate the cached record.
+
+import hashlib
+import json
+import os
+import sqlite3
+
+# Bump this whenever the layout of the parsed records changes, so stale records are discarded
+CacheFormatVersion = "2"
+
+class ParseCache:
+    def __init__(self, cacheFilename: str, verifyHash: bool):
+        self.CacheFilename = cacheFilename
+        self.VerifyHash = verifyHash
+        self.Hits = 0
+        self.Misses = 0
+        self._fileState = {}
+        self._updates = []
+        cacheFolder = os.path.dirname(cacheFilename)
+        if cacheFolder:
+            os.makedirs(cacheFolder, exist_ok=True)
+        self._connection = sqlite3.connect(cacheFilename)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS Metadata (Key TEXT PRIMARY KEY, Value TEXT)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS ParsedFiles (Filename TEXT PRIMARY KEY, MTime INTEGER, Size INTEGER, Hash TEXT, Record TEXT)")
+        row = self._connection.execute("SELECT Value FROM Metadata WHERE Key = 'FormatVersion'").fetchone()
+        if row is None or row[0] != CacheFormatVersion:
+            self._connection.execute("DELETE FROM ParsedFiles")
+            self._connection.execute("INSERT OR REPLACE INTO Metadata (Key, Value) VALUES ('FormatVersion', ?)", (CacheFormatVersion,))
+
+    def Lookup(self, filename: str):
+        # Returns the cached record for the file, or None when the file must be parsed again. A file
+        # that was removed or replaced after the workspace was scanned is treated as a miss.
+        try:
+            return self._lookup(filename)
+        except OSError:
+            self._fileState.pop(filename, None)
+            self.Misses += 1
+            return None
+
+    def _lookup(self, filename: str):
+        stat = os.stat(filename)
+        fileHash = None
+        row = self._connection.execute("SELECT MTime, Size, Hash, Record FROM ParsedFiles WHERE Filename = ?", (filename,)).fetchone()
+        if row is not None:
+            mtime, size, storedHash, record = row
+            statUnchanged = mtime == stat.st_mtime_ns and size == stat.st_size
+            if statUnchanged and not self.VerifyHash:
+                self.Hits += 1
+                return json.loads(record)
+            if self.VerifyHash and size == stat.st_size:
+                fileHash = HashFile(filename)
+                if fileHash == storedHash:
+                    self.Hits += 1
+                    if not statUnchanged:
+                        # the file was touched but its content is the same
+                        self._updates.append((filename, stat.st_mtime_ns, stat.st_size, fileHash, record))
+                    return json.loads(record)
+        if self.VerifyHash and fileHash is None:
+            fileHash = HashFile(filename)
+        self.Misses += 1
+        self._fileState[filename] = (stat.st_mtime_ns, stat.st_size, fileHash)
+        return None
+
+    def Store(self, filename: str, record: dict):
+        # Store the record parsed from a file that was previously looked up and missed
+        if filename not in self._fileState:
+            return
+        mtime, size, fileHash = self._fileState.pop(filename)
+        self._updates.append((filename, mtime, size, fileHash, json.dumps(record)))
+
+    def Close(self, seenFilenames: list):
+        # Write the new records and remove the records of files that no longer exist
+        self._connection.executemany("INSERT OR REPLACE INTO ParsedFiles (Filename, MTime, Size, Hash, Record) VALUES (?, ?, ?, ?, ?)", self._updates)
+        seen = set(seenFilenames)
+        removed = [(filename,) for (filename,) in self._connection.execute("SELECT Filename FROM ParsedFiles") if filename not in seen]
+        self._connection.executemany("DELETE FROM ParsedFiles WHERE Filename = ?", removed)
+        self._connection.commit()
+        self._connection.close()
+        self._updates = []
+
+def HashFile(filename: str):
+    fileHash = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            fileHash.update(block)
+    return fileHash.hexdigest()
@@ -1,26 +1,177 @@
+# Prints the folder structure of a project, optionally with the files in each folder.
+#
+# The directory tree is walked with os.scandir in the same order as os.walk. Excluded
+# folders are compared by their full name and are never entered, so the files under
+# folders like node_modules or packages are not visited at all. The lines are
+# generated one at a time and written to the standard output as they are produced.
+
 import os
+import sys
+import re
+import fnmatch
 import argparse
 
-parser = argparse.ArgumentParser("python ProjectFileStructure.py", description='Tool for visualizing the project directory structure.')
-parser.add_argument("-f", "--includefilenames", default=False, help="List the files in the project as well as the directory structure", action="store_true")
-args = parser.parse_args()
-
-show_filenames = args.includefilenames
-
-def list_files(startpath):
-    excluded = set(['bin', 'obj', 'node_modules', 'dist', 'packages', '.git', '.vs'])
-    for root, dirs, files in os.walk(startpath, topdown=True):
-        found = False
-        for folder in excluded:
-            if folder in root:
-                found = True
-        if not found:
-            level = root.replace(startpath, '').count(os.sep)
-            indent = ' ' * 4 * (level)
-            print('{}{}/'.format(indent, os.path.basename(root)))
-            if show_filenames:
-                subindent = ' ' * 4 * (level + 1)
-                for f in files:
-                    print('{}{}'.format(subindent, f))
-
-list_files('.')
+# folders that are never part of the source tree of a project
+defaultExcludedFolders = set(['bin', 'obj', 'node_modules', 'dist', 'packages', '.git', '.vs'])
+
+def TranslateGitignorePattern(pattern: str):
+    # Returns a compiled regular expression matching the paths, relative to the folder of the
+    # .gitignore file, that the pattern matches
+    output = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            output.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            output.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            output.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            output.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            characters = pattern[i + 1:end].replace("\\", "\\\\")
+            if characters.startswith("!"):
+                characters = "^" + characters[1:]
+            output.append(f"[{characters}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            output.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            output.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(output) + r"\Z")
+
+class GitignoreRule:
+    __slots__ = ("Folder", "Pattern", "Negated", "DirectoryOnly", "MatchName")
+
+    def __init__(self, folder: str, line: str):
+        # folder is the folder of the .gitignore file, relative to the start folder
+        self.Folder = folder
+        self.Negated = line.startswith("!")
+        if self.Negated:
+            line = line[1:]
+        self.DirectoryOnly = line.endswith("/")
+        line = line.rstrip("/")
+        # a pattern without a slash matches the name of a file or folder at any depth
+        self.MatchName = "/" not in line
+        self.Pattern = TranslateGitignorePattern(line.lstrip("/"))
+
+    def Matches(self, relativePath: str, name: str, isDirectory: bool):
+        if self.DirectoryOnly and not isDirectory:
+            return False
+        if self.MatchName:
+            return self.Pattern.match(name) is not None
+        if self.Folder:
+            if not relativePath.startswith(self.Folder + "/"):
+                return False
+            relativePath = relativePath[len(self.Folder) + 1:]
+        return self.Pattern.match(relativePath) is not None
+
+def ReadGitignore(directory: str, folder: str):
+    # The rules of the .gitignore file in the directory, or an empty list if there is none
+    rules = []
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\n").rstrip("\r")
+                if line.endswith(" ") and not line.endswith("\\ "):
+                    line = line.rstrip(" ")
+                if len(line) == 0 or line.startswith("#"):
+                    continue
+                if line.startswith("\\#") or line.startswith("\\!"):
+                    line = line[1:]
+                rules.append(GitignoreRule(folder, line))
+    except OSError:
+        pass
+    return rules
+
+def IsIgnored(rules: list, relativePath: str, name: str, isDirectory: bool):
+    # The last rule that matches decides, so deeper .gitignore files override the rules of their parents
+    ignored = False
+    for rule in rules:
+        if rule.Negated == ignored and rule.Matches(relativePath, name, isDirectory):
+            ignored = not rule.Negated
+    return ignored
+
+def IsExcluded(excludePatterns: list, relativePath: str, name: str):
+    for pattern in excludePatterns:
+        if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relativePath, pattern):
+            return True
+    return False
+
+def list_files(startpath: str, showFilenames: bool = False, maxDepth: int = None, excluded: set = None, excludePatterns: list = None, useGitignore: bool = False, maxFiles: int = None):
+    # Generates the lines showing the folder structure below startpath. Folders named as one of
+    # the excluded folders, and files and folders matching one of the exclude patterns (compared
+    # with the name and with the path relative to startpath) are skipped. maxDepth limits the
+    # number of folder levels shown below startpath, and maxFiles the number of files listed in
+    # each folder.
+    if excluded is None:
+        excluded = defaultExcludedFolders
+    if excludePatterns is None:
+        excludePatterns = []
+    # (directory, path relative to startpath, level, gitignore rules in effect)
+    stack = [(startpath, "", 0, [])]
+    while stack:
+        directory, relativeDirectory, level, rules = stack.pop()
+        if useGitignore:
+            rules = rules + ReadGitignore(directory, relativeDirectory)
+        subDirectories = []
+        filenames = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    relativePath = f"{relativeDirectory}/{name}" if relativeDirectory else name
+                    try:
+                        isDirectory = entry.is_dir()
+                    except OSError:
+                        isDirectory = False
+                    if isDirectory:
+                        if name in excluded or entry.is_symlink():
+                            continue
+                    elif not showFilenames:
+                        continue
+                    if IsExcluded(excludePatterns, relativePath, name):
+                        continue
+                    if useGitignore and IsIgnored(rules, relativePath, name, isDirectory):
+                        continue
+                    if isDirectory:
+                        subDirectories.append((entry.path, relativePath))
+                    else:
+                        filenames.append(name)
+        except OSError:
+            continue
+        indent = ' ' * 4 * level
+        yield f"{indent}{os.path.basename(directory)}/\n"
+        if showFilenames:
+            subindent = ' ' * 4 * (level + 1)
+            shownFilenames = filenames if maxFiles is None else filenames[:maxFiles]
+            for filename in shownFilenames:
+                yield f"{subindent}{filename}\n"
+            if len(shownFilenames) < len(filenames):
+                yield f"{subindent}... {len(filenames) - len(shownFilenames)} more files\n"
+        if maxDepth is None or level < maxDepth:
+            for subDirectory, relativePath in reversed(subDirectories):
+                stack.append((subDirectory, relativePath, level + 1, rules))
+
+def main():
+    parser = argparse.ArgumentParser("python ProjectFileStructure.py", description='Tool for visualizing the project directory structure.')
+    parser.add_argument("-f", "--includefilenames", default=False, help="List the files in the project as well as the directory structure", action="store_true")
+    parser.add_argument("-d", "--max-depth", default=None, help="Number of folder levels shown below the current folder. Default: all", type=int)
+    parser.add_argument("-e", "--exclude", default=[], help="Skip the files and folders matching this pattern, e.g. -e \"*.user\" -e \"Docs/*\". Can be given several times", action="append")
+    parser.add_argument("-g", "--gitignore", default=False, help="Skip the files and folders ignored by the .gitignore files", action="store_true")
+    parser.add_argument("-m", "--max-files", default=None, help="Number of files listed in each folder when listing the files. Default: all", type=int)
+    args = parser.parse_args()
+
+    # sys.stdout is block buffered when the output is redirected, and writes to the Windows console
+    # through the console API, so names with non-ASCII characters are shown correctly
+    sys.stdout.writelines(list_files('.', args.includefilenames, args.max_depth, defaultExcludedFolders, args.exclude, args.gitignore, args.max_files))
+
+if __name__ == "__main__":
+    main()
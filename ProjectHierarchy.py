@@ -1,48 +1,22 @@
-# Required package: pyDot
+# Required package for generating images (-img): pyDot
 # Install using pip: pip install pydot
 #
 # pyDot requires GraphViz to render PNG and SVG files:
 # Download: https://graphviz.gitlab.io/_pages/Download/Download_windows.html
 # Remember to add the GraphViz bin folder to the PATH environment variable:
 # C:\Program Files (x86)\Graphviz2.38\bin
+#
+# pyDot and GraphViz are only looked for when images are generated, and the
+# modules that are only needed by some of the parameters are imported when they
+# are used, so generating the markdown files starts quickly.
 
 import os
 import os.path
-import re
 import argparse
-from importlib import util
-
-# Verify that pydot package is installed
-pydot_loader = util.find_spec('pydot')
-if pydot_loader is None:
-    print("Fatal error!")
-    print("Required package 'pydot' not found. Please install pydot using 'pip install pydot'")
-    exit()
-import pydot
-
-# Verify thet Graphviz is installed
-path = os.environ.get('PATH', '')
-graphVizNotFound = re.search("graphviz", path, re.IGNORECASE) is None
-if graphVizNotFound:
-    print("Fatal error!")
-    print("Required program not found. Please download and install Graphviz from: https://graphviz.gitlab.io/_pages/Download/Download_windows.html ")
-    exit()
-
-parser = argparse.ArgumentParser("python ProjectHierarchy.py", description="Tool for visualizing the project hierarchy for a C# solution.")
-parser.add_argument("-ph", "--generateprojecthierarchy", default=False, help="Generate project hierarchy in xml format for each cs-project file", action="store_true")
-parser.add_argument("-sr", "--generatesolutionreadme", default=True, help="Generate solution readme in markdown format for each solution file", action="store_true")
-parser.add_argument("-dg", "--generatedirectedgraph", default=False, help="Generate directed graph in dgml format for each cs-project file", action="store_true")
-parser.add_argument("-gm", "--generategraphml", default=False, help="Generate directed graph  in GraphML (xml) format for each cs-project file", action="store_true")
-parser.add_argument("-img", "--generateimage", default=False, help="Generate directed graph in PNG format for each cs-project file. The format can be changed by the -f parameter", action="store_true")
-parser.add_argument("-f", "--pydotformat", default="png", help="Specifies the image output format. Valid formats: dia, dot, gd, gif, jpg, pdf, png, ps, svg, vml", type=str)
-args = parser.parse_args()
-
-generateProjectHierarchy = args.generateprojecthierarchy
-generateSolutionReadme = args.generatesolutionreadme
-generateDirectedGraph = args.generatedirectedgraph
-generateGraphML = args.generategraphml
-generateImg = args.generateimage
-pyDotOutputFormat = args.pydotformat
+from ProjectParser import ParseFile
+from DependencyGraph import DependencyGraph, ProjectCycleError
+from PackageIndex import PackageIndex
+import Profiler
 
 pyDotFormats = [
     'canon', 'cmap', 'cmapx',
@@ -54,11 +28,10 @@ pyDotFormats = [
     'plain-ext', 'png', 'ps', 'ps2',
     'svg', 'svgz', 'vml', 'vmlz',
     'vrml', 'vtx', 'wbmp', 'xdot', 'xlib']
-if pyDotOutputFormat not in pyDotFormats:
-    print(f"Illegal argument specified for parameter --pydotformat (-f): {pyDotOutputFormat}")
-    exit()
 
 class Project:
+    __slots__ = ("ProjectFilename", "ProjectName", "ProjectRootPath", "SubProjects", "TargetFramework", "RootNamespace", "Packages", "PackageDictionary")
+
     def __init__(self, projectFilename: str, projectName: str, projectRootPath: str):
         self.ProjectFilename = projectFilename
         self.ProjectName = projectName
@@ -67,320 +40,1060 @@ class Project:
         self.TargetFramework = ""
         self.RootNamespace = ""
         self.Packages = []
+        # The version of each package used, by the name the package index knows it by
         self.PackageDictionary = {}
 
 class Solution:
+    __slots__ = ("SolutionName", "Packages")
+
     def __init__(self, solutionName: str):
         self.SolutionName = solutionName
-        self.Packages = []
+        # The names of the packages used in the solution as the package index knows them, as the keys of a dictionary
+        self.Packages = {}
 
 class Link:
+    __slots__ = ("Source", "Target")
+
     def __init__(self, source: str, target: str):
         self.Source = source
         self.Target = target
 
-def GeneratedProjectHierarchy(subProjects: list, projectName: str, indent: int):
-    indentation = " " * (indent * 3)
-    displayName = projectName.replace(".csproj", "")
-    if (len(subProjects) == 0):
-        output = f"{indentation}<{displayName}/>\n"
-    else:
-        output = f"{indentation}<{displayName}>\n"
-        for subProject in subProjects:
-            result = GeneratedProjectHierarchy(subProject.SubProjects, subProject.ProjectName, indent + 1)
-            output = f"{output}{result}"
-        output = f"{output}{indentation}</{displayName}>\n"
-    return output
-
-def GenerateDirectedGraphNodes(projects: list, projectName: str, includeLabel: bool, tagName: str, idAttr: str):
-    label = ""
-    if includeLabel:
-        label = f" Label=\"{projectName}\""
-    output = f"   <{tagName} {idAttr}=\"{projectName}\"{label}/>\n"
-    if (len(projects) > 0):
-        for subProject in projects:
-            result = GenerateDirectedGraphNodes(subProject.SubProjects, subProject.ProjectName, includeLabel, tagName, idAttr)
-            output = f"{output}{result}"
-    return output
-
-def GenerateDirectedGraphLinks(subProjects: list, displayName: str, parentDisplayName: str, tagName: str, sourceAttr: str, targetAttr: str):
-    if len(parentDisplayName) > 0:
-        output = f"   <{tagName} {sourceAttr}=\"{parentDisplayName}\" {targetAttr}=\"{displayName}\"/>\n"
-    else:
-        output = ""
-    if (len(subProjects) > 0):
-        for subProject in subProjects:
-            result = GenerateDirectedGraphLinks(subProject.SubProjects, subProject.ProjectName, displayName, tagName, sourceAttr, targetAttr)
-            output = f"{output}{result}"
-    return output
-
-def GenerateDirectedGraph(projects: list, projectName: str):
-    nodes = GenerateDirectedGraphNodes(projects, projectName, True, "Node", "Id")
-    links = GenerateDirectedGraphLinks(projects, projectName, "", "Link", "Source", "Target")
-    output = f"<DirectedGraph xmlns=\"http://schemas.microsoft.com/vs/2009/dgml\">\n"\
-        f"<Nodes>\n{nodes}</Nodes>\n"\
-        f"<Links>\n{links}</Links>\n"\
-        "</DirectedGraph>"
-    return output
-
-def GenerateGraphMLNodes(projects: list, projectName: str):
-    width = len(projectName) * 6.3
-    output = {f"   <node id=\"{projectName}\">\n"
-              f"     <data key=\"d0\">\n"
-              f"       <y:ShapeNode>\n"
-              f"         <y:Geometry height=\"30.0\" width=\"{width}\"/>\n"
-              f"         <y:NodeLabel visible=\"true\" autoSizePolicy=\"content\">{projectName}</y:NodeLabel>\n"
-              f"       </y:ShapeNode>\n"
-              f"     </data>\n"
-              f"   </node>"}
-    if (len(projects) > 0):
-        for subProject in projects:
-            result = GenerateGraphMLNodes(subProject.SubProjects, subProject.ProjectName)
-            output.update(output, result)
-    return output
-
-def GenerateGraphML(projects: list, projectName: str):
-    nodes = "\n".join(list(GenerateGraphMLNodes(projects, projectName)))
-    links = GenerateDirectedGraphLinks(projects, projectName, "", "edge", "source", "target")
-    output = f"{nodes}\n{links}"
-    output = output.replace("<edge", "<edge directed=\"true\"")
-    return output
-
-def GeneratePyDotLinks(subProjects: list, displayName: str, parentDisplayName: str):
-    if len(parentDisplayName) > 0:
-        output = {(parentDisplayName, displayName)}
+class WorkspaceIndex:
+    __slots__ = ("SolutionFilenames", "ProjectFilenames", "PackagesConfigFilenames", "PackagesPropsFilenames", "CSharpFileCount")
+
+    def __init__(self):
+        self.SolutionFilenames = []
+        self.ProjectFilenames = []
+        # packages.config files of legacy projects and Directory.Packages.props files with central package versions
+        self.PackagesConfigFilenames = []
+        self.PackagesPropsFilenames = []
+        # number of C# files in each directory, including the files in its subdirectories
+        self.CSharpFileCount = {}
+
+    def GetCSharpFileCount(self, directory: str):
+        return self.CSharpFileCount.get(directory, 0)
+
+    def GetParsedFilenames(self):
+        # All the files that are parsed, solutions first
+        return self.SolutionFilenames + self.ProjectFilenames + self.PackagesConfigFilenames + self.PackagesPropsFilenames
+
+class ScanOptions:
+    __slots__ = ("ExcludedFolders", "UseCache", "CacheFilename", "CacheHash", "Jobs")
+
+    def __init__(self, excludedFolders: set = None, useCache: bool = False, cacheFilename: str = None, cacheHash: bool = False, jobs: int = 1):
+        self.ExcludedFolders = excludedFolders if excludedFolders is not None else defaultExcludedFolders
+        # Cache the parsed files in cacheFilename, by default .csharptools/cache.sqlite in the root folder
+        self.UseCache = useCache
+        self.CacheFilename = cacheFilename
+        self.CacheHash = cacheHash
+        # Number of processes used for parsing the project files, 0 means one per CPU
+        self.Jobs = jobs
+
+class Workspace:
+    __slots__ = ("Root", "Index", "Records", "Projects", "Solutions", "PackageIndex", "ProjectInSolutions", "ProjectsInSolution", "Graph", "ProjectHierarchies", "CacheHits", "CacheMisses")
+
+    def __init__(self, root: str, index: WorkspaceIndex):
+        self.Root = root
+        self.Index = index
+        # The parsed record of each solution, project and package file by filename
+        self.Records = {}
+        # Project by project filename, e.g. 'ClassLibrary1.csproj'
+        self.Projects = {}
+        # Solution by the names of the solutions a group of projects is included in, e.g. 'A.sln, B.sln'
+        self.Solutions = {}
+        # The versions of each package used and the projects using them
+        self.PackageIndex = None
+        # The names of the solutions each project is included in
+        self.ProjectInSolutions = {}
+        # The names of the projects included in each group of solutions, '' for projects not in any solution
+        self.ProjectsInSolution = {}
+        self.Graph = None
+        # The short xml hierarchies of the projects, generated by GetProjectHierarchies when first used
+        self.ProjectHierarchies = None
+        self.CacheHits = None
+        self.CacheMisses = None
+
+# folders that are never part of the source tree of a project
+defaultExcludedFolders = set(['bin', 'obj', 'node_modules', 'dist', 'packages', '.git', '.vs', '.csharptools'])
+
+def ScanWorkspace(startPath: str, excluded: set):
+    # Walk the directory tree once, in the same order as os.walk, classifying the
+    # .sln, .csproj and .cs files as we go. Excluded folders are never entered.
+    index = WorkspaceIndex()
+    scannedDirectories = []
+    stack = [(startPath, None)]
+    while stack:
+        directory, parentDirectory = stack.pop()
+        csharpFiles = 0
+        subDirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        isDirectory = entry.is_dir()
+                    except OSError:
+                        isDirectory = False
+                    name = entry.name
+                    if isDirectory:
+                        if name not in excluded and not entry.is_symlink():
+                            subDirectories.append(os.path.join(directory, name))
+                    elif name.endswith(".cs"):
+                        csharpFiles += 1
+                    elif name.endswith(".csproj"):
+                        index.ProjectFilenames.append(os.path.join(directory, name))
+                    elif name.endswith(".sln"):
+                        index.SolutionFilenames.append(os.path.join(directory, name))
+                    elif name.lower() == "packages.config":
+                        index.PackagesConfigFilenames.append(os.path.join(directory, name))
+                    elif name.lower() == "directory.packages.props":
+                        index.PackagesPropsFilenames.append(os.path.join(directory, name))
+        except OSError:
+            continue
+        index.CSharpFileCount[directory] = csharpFiles
+        scannedDirectories.append((directory, parentDirectory))
+        for subDirectory in reversed(subDirectories):
+            stack.append((subDirectory, directory))
+    # add the counts of each folder to its parent, deepest folders first
+    for directory, parentDirectory in reversed(scannedDirectories):
+        if parentDirectory is not None:
+            index.CSharpFileCount[parentDirectory] += index.CSharpFileCount[directory]
+    return index
+
+def ParseOrSkip(parse, filename: str):
+    # The record parsed from the file, or None when the file can no longer be read, for example
+    # because it was removed after the workspace was scanned
+    try:
+        return parse(filename)
+    except OSError:
+        return None
+
+def ParseFiles(filenames: list, parse, cache, executor, jobs: int):
+    # Returns the parsed record for each file, in the same order as the filenames, or None for
+    # the files that could not be read. The cached record is used when the file has not changed,
+    # and the remaining files are parsed by the executor when one is given.
+    records = [None] * len(filenames)
+    missing = []
+    for i, filename in enumerate(filenames):
+        if cache is not None:
+            records[i] = cache.Lookup(filename)
+        if records[i] is None:
+            missing.append(i)
+    missingFilenames = [filenames[i] for i in missing]
+    if executor is not None and len(missingFilenames) > 1:
+        chunksize = max(1, len(missingFilenames) // (jobs * 4))
+        parsedRecords = executor.map(ParseOrSkip, [parse] * len(missingFilenames), missingFilenames, chunksize=chunksize)
     else:
-        output = set()
-    if (len(subProjects) > 0):
-        for subProject in subProjects:
-            result = GeneratePyDotLinks(subProject.SubProjects, subProject.ProjectName, displayName)
-            output.update(output, result)
-    return output
-
-def GenerateImage(projects: list, projectName: str):
-    links = list(GeneratePyDotLinks(projects, projectName, ""))
-    if len(links) > 0:
-        graph = pydot.Dot(graph_type='digraph')
-        for link in links:
-            edge = pydot.Edge(link[0], link[1])
-            graph.add_edge(edge)
-        if generateImg:
-            graph.write(f"{projectName}.{pyDotOutputFormat}", format=pyDotOutputFormat)
-
-# find all files recursively under the current folder that ends with *.sln
-solutionFilenames = [os.path.join(dp, f) for dp, dn, filenames in os.walk(".") for f in filenames if f.endswith(".sln")]
-projectInSolutions = {}
-for solutionFilename in solutionFilenames:
-    f = open(solutionFilename)
-    solutionName = os.path.basename(solutionFilename)
-    line = f.readline()  # skip first line that contains BOM info
-    line = f.readline()
-    while line:
-        match = re.match(r".*\".*\\(.*?\.csproj)\"", line, re.IGNORECASE)
-        if match:
-            projectFilename = match.group(1)
+        parsedRecords = map(ParseOrSkip, [parse] * len(missingFilenames), missingFilenames)
+    for i, record in zip(missing, parsedRecords):
+        records[i] = record
+        if cache is not None and record is not None:
+            cache.Store(filenames[i], record)
+    Profiler.Count("Files parsed", len(missing))
+    Profiler.Count("Files read from cache", len(filenames) - len(missing))
+    return records
+
+def IndentLines(text: str, indentation: str):
+    # Indent every line of a text that ends with a newline
+    return indentation + text[:-1].replace("\n", f"\n{indentation}") + "\n"
+
+# The longest project hierarchy kept in memory, in characters
+hierarchyTextLimit = 8192
+
+def GenerateShortProjectHierarchies(graph: DependencyGraph):
+    # Returns the xml hierarchy, without indentation, of every project whose hierarchy is shorter than
+    # hierarchyTextLimit, and None for the other projects. Each hierarchy is generated once and reused
+    # in the hierarchies of the projects referencing it. The limit keeps the memory used bounded,
+    # because the hierarchy of a project repeats the hierarchy of every project it references.
+    def generateProjectHierarchy(projectName: str, hierarchies: dict):
+        displayName = projectName.replace(".csproj", "")
+        subProjectNames = graph.Children[projectName]
+        if (len(subProjectNames) == 0):
+            return f"<{displayName}/>\n"
+        output = [f"<{displayName}>\n"]
+        for subProjectName in subProjectNames:
+            if hierarchies[subProjectName] is None:
+                return None
+            output.append(IndentLines(hierarchies[subProjectName], " " * 3))
+        output.append(f"</{displayName}>\n")
+        hierarchy = "".join(output)
+        return hierarchy if len(hierarchy) <= hierarchyTextLimit else None
+    return graph.ComputeBottomUp(generateProjectHierarchy)
+
+def GenerateProjectHierarchy(graph: DependencyGraph, hierarchies: dict, projectName: str):
+    # The xml hierarchy of the project references of a project, in chunks of lines. The short
+    # hierarchies are taken from hierarchies and indented, the others are generated from the
+    # references in the graph while the readme is written, so they are never held in memory.
+    lines = []
+    # the projects still to be written with their indentation, and the end tags as strings
+    stack = [(projectName, "")]
+    while len(stack) > 0:
+        item = stack.pop()
+        if isinstance(item, str):
+            lines.append(item)
+            continue
+        name, indentation = item
+        hierarchy = hierarchies[name]
+        if hierarchy is not None:
+            lines.append(IndentLines(hierarchy, indentation) if indentation else hierarchy)
+        else:
+            displayName = name.replace(".csproj", "")
+            lines.append(f"{indentation}<{displayName}>\n")
+            stack.append(f"{indentation}</{displayName}>\n")
+            subIndentation = indentation + " " * 3
+            for subProjectName in reversed(graph.Children[name]):
+                stack.append((subProjectName, subIndentation))
+        if len(lines) >= 64:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+def EscapeXml(value: str):
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\"", "&quot;")
+
+def GenerateDirectedGraphNodes(graph: DependencyGraph, projectName: str, includeLabel: bool, tagName: str, idAttr: str):
+    for nodeName in graph.Nodes(projectName):
+        nodeName = EscapeXml(nodeName)
+        label = ""
+        if includeLabel:
+            label = f" Label=\"{nodeName}\""
+        yield f"   <{tagName} {idAttr}=\"{nodeName}\"{label}/>\n"
+
+def GenerateDirectedGraphLinks(graph: DependencyGraph, projectName: str, tagName: str, sourceAttr: str, targetAttr: str):
+    for source, target in graph.Links(projectName):
+        yield f"   <{tagName} {sourceAttr}=\"{EscapeXml(source)}\" {targetAttr}=\"{EscapeXml(target)}\"/>\n"
+
+def GenerateDirectedGraph(graph: DependencyGraph, projectName: str):
+    yield "<?xml version='1.0' encoding='utf-8'?>\n"
+    yield "<DirectedGraph xmlns=\"http://schemas.microsoft.com/vs/2009/dgml\">\n"
+    yield "<Nodes>\n"
+    yield from GenerateDirectedGraphNodes(graph, projectName, True, "Node", "Id")
+    yield "</Nodes>\n"
+    yield "<Links>\n"
+    yield from GenerateDirectedGraphLinks(graph, projectName, "Link", "Source", "Target")
+    yield "</Links>\n"
+    yield "</DirectedGraph>\n"
+
+def GenerateGraphMLNodes(graph: DependencyGraph, projectName: str):
+    for nodeName in graph.Nodes(projectName):
+        width = len(nodeName) * 6.3
+        nodeName = EscapeXml(nodeName)
+        yield f"   <node id=\"{nodeName}\">\n"\
+            f"     <data key=\"d0\">\n"\
+            f"       <y:ShapeNode>\n"\
+            f"         <y:Geometry height=\"30.0\" width=\"{width}\"/>\n"\
+            f"         <y:NodeLabel visible=\"true\" autoSizePolicy=\"content\">{nodeName}</y:NodeLabel>\n"\
+            f"       </y:ShapeNode>\n"\
+            f"     </data>\n"\
+            f"   </node>\n"
+
+def GenerateGraphML(graph: DependencyGraph, projectName: str):
+    yield "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"\
+        "<graphml xmlns=\"http://graphml.graphdrawing.org/xmlns\"\n"\
+        "         xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\"\n"\
+        "         xsi:schemaLocation=\"http://graphml.graphdrawing.org/xmlns http://www.yworks.com/xml/schema/graphml/1.1/ygraphml.xsd\"\n"\
+        "         xmlns:y=\"http://www.yworks.com/xml/graphml\">\n"\
+        "    <key for=\"node\" id=\"d0\" yfiles.type=\"nodegraphics\"/>\n"\
+        "  <graph id='G' edgedefault='directed'>\n"
+    yield from GenerateGraphMLNodes(graph, projectName)
+    yield from GenerateDirectedGraphLinks(graph, projectName, "edge directed=\"true\"", "source", "target")
+    yield "  </graph>\n"
+    yield "</graphml>\n"
+
+fileFooter = "This file was autogenerated by the tool: [https://github.com/CoderAllan/CSharpTools/blob/master/ProjectHierarchy.py](https://github.com/CoderAllan/CSharpTools/blob/master/ProjectHierarchy.py)"
+
+def GetRootNamespace(project: Project):
+    if project.RootNamespace:
+        return project.RootNamespace
+    return os.path.splitext(project.ProjectName)[0]
+
+def GetAnchor(projectName: str):
+    # we use the GitHub standard for anchors in the markdown
+    return projectName.lower().replace(' ', '-')
+
+def GenerateProjectBaseInfo(project: Project):
+    return "| | |\n|-|-|\n"\
+        f"|Root namespace|{GetRootNamespace(project)}|\n"\
+        f"|Target framework| {project.TargetFramework}|"
+
+def GenerateProjectStructure(graph: DependencyGraph, hierarchies: dict, projectName: str):
+    yield "The following structure shows the project hierarchy:\n\n```xml\n"
+    yield from GenerateProjectHierarchy(graph, hierarchies, projectName)
+    yield "```"
+
+def GenerateProjectList(projectNames: list):
+    for projectName in projectNames:
+        yield f"* {projectName}\n"
+
+def GenerateProjectDependencies(graph: DependencyGraph, projectName: str):
+    dependencies = graph.Dependencies(projectName)
+    dependents = graph.Dependents(projectName)
+    yield "## Dependencies\n\n"
+    yield "| | |\n|-|-|\n"
+    yield f"|Build level|{graph.BuildLevel(projectName)}|\n"
+    yield f"|Transitive dependencies|{len(dependencies)}|\n"
+    yield f"|Dependent projects|{len(dependents)}|\n\n"
+    if len(dependencies) > 0:
+        yield "The projects this project depends on, directly or indirectly, in build order:\n\n"
+        yield from GenerateProjectList(dependencies)
+        yield "\n"
+    if len(dependents) > 0:
+        yield "The projects depending on this project, directly or indirectly, in build order:\n\n"
+        yield from GenerateProjectList(dependents)
+        yield "\n"
+
+def GenerateBuildOrder(graph: DependencyGraph, projectNames: list):
+    # The projects grouped by build level. The projects on each level only depend on projects on the levels before it.
+    # The levels are the build levels in the whole workspace, so levels without any of the projects are left out.
+    yield "## Build order\n\n"
+    yield "|Level|Projects|\n|-|-|\n"
+    for levelProjectNames in graph.BuildLevels([projectName for projectName in graph.TopologicalOrder if projectName in projectNames]):
+        yield f"|{graph.BuildLevel(levelProjectNames[0])}|{', '.join(levelProjectNames)}|\n"
+    yield "\n"
+
+def GenerateProjectReadme(project: Project, graph: DependencyGraph, hierarchies: dict, csharpFileCount: int, solutionName: str, dependencies: bool = False):
+    # hierarchies holds the short project hierarchies returned by GenerateShortProjectHierarchies. With
+    # dependencies, the transitive dependencies and dependents of the project are included.
+    yield f"# Project {project.ProjectName}\n\n"
+    yield f"{GenerateProjectBaseInfo(project)}\n"
+    yield f"|Number of C# files|{csharpFileCount}|\n"
+    yield f"|Project included in|{solutionName}|\n\n"
+    yield "## Packages\n\n"
+    yield "|Package|Version|\n|-|-|"
+    for package in sorted(project.Packages, key=lambda s: s.lower()):
+        yield f"\n|{package}|"
+    yield "\n\n"
+    yield "## Project hierarchy\n\n"
+    yield from GenerateProjectStructure(graph, hierarchies, project.ProjectName)
+    yield "\n\n"
+    if dependencies:
+        yield from GenerateProjectDependencies(graph, project.ProjectName)
+    yield fileFooter
+
+def GenerateSolutionReadme(solutionName: str, projectNames: list, packages: list, projectDictionary: dict, graph: DependencyGraph, hierarchies: dict, dependencies: bool = False):
+    # The package matrix is generated one row at a time, so its size does not matter. With
+    # dependencies, the build order of the projects is included.
+    yield f"# {solutionName}\n\n"
+    yield "## Projects\n\n"
+    yield "|Project|Root namespace|Target framework|\n|-|-|-|\n"
+    for projectName in projectNames:
+        project = projectDictionary[projectName]
+        yield f"|[{projectName}](#{GetAnchor(projectName)})|{GetRootNamespace(project)}|{project.TargetFramework}|\n"
+    yield "\n"
+    yield "## Packages\n\n"
+    yield "".join(["|Project"] + [f"|{package}" for package in packages] + ["|\n"])
+    yield "|-" * (len(packages) + 1) + "|\n"
+    for projectName in projectNames:
+        packageDictionary = projectDictionary[projectName].PackageDictionary
+        yield "".join([f"|{projectName}"] + [f"|{packageDictionary.get(package, '')}" for package in packages] + ["|\n"])
+    yield "|\n\n"
+    if dependencies:
+        yield from GenerateBuildOrder(graph, set(projectNames))
+    for projectName in projectNames:
+        yield f"## Project {projectName}<a name=\"{GetAnchor(projectName)}\"></a>\n\n"
+        yield f"{GenerateProjectBaseInfo(projectDictionary[projectName])}\n\n"
+        yield from GenerateProjectStructure(graph, hierarchies, projectName)
+        yield "\n\n"
+    yield fileFooter
+
+def WriteFile(filename: str, chunks):
+    # Write the generated chunks of a document to a buffered file as they are produced,
+    # so the whole document never has to be held in memory.
+    if Profiler.enabled:
+        # generate the whole document first, so generating and writing are timed separately
+        with Profiler.Stage("generate"):
+            chunks = list(chunks)
+        Profiler.Count("Files written")
+        Profiler.Count("Characters written", sum(len(chunk) for chunk in chunks))
+        with Profiler.Stage("write files"):
+            with open(filename, "w", buffering=65536) as file:
+                file.writelines(chunks)
+        return
+    with open(filename, "w", buffering=65536) as file:
+        file.writelines(chunks)
+
+def ReadText(filename: str, length: int):
+    # The first length characters of a text file, in blocks
+    with open(filename) as file:
+        while length > 0:
+            block = file.read(min(length, 65536))
+            if block == "":
+                return
+            length -= len(block)
+            yield block
+
+def WriteFileIfChanged(filename: str, generateChunks):
+    # Write the document produced by generateChunks() only if it differs from the content of the file.
+    # The document is generated once and compared with the file while it is generated, so neither version
+    # is held in memory. At the first difference, the part that is the same is copied from the file and the
+    # rest of the document is written after it, to a new file that then replaces the file. Returns True if written.
+    import itertools
+    if not os.path.exists(filename):
+        WriteFile(filename, generateChunks())
+        return True
+    chunks = iter(generateChunks())
+    sameLength = 0
+    with open(filename) as file:
+        for chunk in chunks:
+            if file.read(len(chunk)) != chunk:
+                break
+            sameLength += len(chunk)
+        else:
+            if file.read(1) == "":
+                Profiler.Count("Files unchanged")
+                return False
+            # the file is longer than the document
+            chunk = ""
+    temporaryFilename = f"{filename}.tmp"
+    WriteFile(temporaryFilename, itertools.chain(ReadText(filename, sameLength), [chunk], chunks))
+    os.replace(temporaryFilename, filename)
+    return True
+
+def WriteOutput(filename: str, generateChunks, skipUnchanged: bool):
+    if skipUnchanged:
+        return WriteFileIfChanged(filename, generateChunks)
+    WriteFile(filename, generateChunks())
+    return True
+
+def GetProjectPackages(projectFilename: str, projectRecord: dict, packagesConfigRecords: dict, centralPackageVersions: dict):
+    # The [package, version] pairs used by a project. The versions of the packages in the packages.config
+    # file next to a legacy project replace the assembly versions found in the project file, and packages
+    # without a version get their version from the nearest Directory.Packages.props.
+    packages = [list(package) for package in projectRecord["Packages"]]
+    projectFolder = os.path.dirname(projectFilename)
+    if projectFolder in packagesConfigRecords:
+        packageIndex = {package[0].lower(): package for package in packages}
+        for package, version in packagesConfigRecords[projectFolder]["Packages"]:
+            if package.lower() in packageIndex:
+                packageIndex[package.lower()][1] = version
+            else:
+                packages.append([package, version])
+    if any(version is None for package, version in packages):
+        packageVersions = {}
+        folder = projectFolder
+        while True:
+            if folder in centralPackageVersions:
+                packageVersions = centralPackageVersions[folder]
+                break
+            parentFolder = os.path.dirname(folder)
+            if parentFolder == folder:
+                break
+            folder = parentFolder
+        for package in packages:
+            if package[1] is None:
+                package[1] = packageVersions.get(package[0].lower())
+        # packages whose version is not found anywhere are left out
+        packages = [package for package in packages if package[1] is not None]
+    return packages
+
+def BuildProjectModel(index: WorkspaceIndex, records: dict):
+    # Merge the parsed records into the Project and Solution objects. The records are
+    # processed in the order the files were found, so the result does not depend on
+    # the order in which the files were parsed. Files without a record are skipped. Returns the
+    # solutions of each project, the projects, the solutions and the index of the packages used.
+    solutionFilenames = [filename for filename in index.SolutionFilenames if filename in records]
+    projectFilenames = [filename for filename in index.ProjectFilenames if filename in records]
+    packagesConfigRecords = {}
+    for filename in index.PackagesConfigFilenames:
+        if filename in records:
+            packagesConfigRecords[os.path.dirname(filename)] = records[filename]
+    centralPackageVersions = {}
+    for filename in index.PackagesPropsFilenames:
+        if filename in records:
+            centralPackageVersions[os.path.dirname(filename)] = {package.lower(): version for package, version in records[filename]["PackageVersions"]}
+
+    projectInSolutions = {}
+    for solutionFilename in solutionFilenames:
+        solutionName = os.path.basename(solutionFilename)
+        for projectFilename in records[solutionFilename]["Projects"]:
             if projectFilename in projectInSolutions:
                 projectInSolutions[projectFilename] = f"{projectInSolutions[projectFilename]}, {solutionName}"
             else:
                 projectInSolutions[projectFilename] = f"{solutionName}"
-        line = f.readline()
-    f.close()
-
-# find all files recursively under the current folder that ends with *.csproj
-projectFilenames = [os.path.join(dp, f) for dp, dn, filenames in os.walk(".") for f in filenames if f.endswith(".csproj")]
-
-projectDictionary = {}
-solutions = {}
-for projectFilename in projectFilenames:
-    projectName = os.path.basename(projectFilename)
-    if projectName in projectDictionary:
-        currentProject = projectDictionary[projectName]
-        currentProject.ProjectFilename = projectFilename
-    else:
-        currentProject = Project(projectFilename, projectName, "")
-    if projectName in projectInSolutions:
-        solutionName = projectInSolutions[projectName]
-    else:
-        solutionName = "N/A"
-    f = open(projectFilename)
-    line = f.readline()
-    while line:
-        match = re.match(r".*<(?:Package)?Reference Include=\"(.*?)\"?,? Version=\"?(.*?)(?:,|\")", line, re.IGNORECASE)
-        if match:
-            package = match.group(1)
-            version = match.group(2)
+
+    projectDictionary = {}
+    solutions = {}
+    packageIndex = PackageIndex()
+    for projectFilename in projectFilenames:
+        projectRecord = records[projectFilename]
+        projectName = os.path.basename(projectFilename)
+        if projectName in projectDictionary:
+            currentProject = projectDictionary[projectName]
+            currentProject.ProjectFilename = projectFilename
+        else:
+            currentProject = Project(projectFilename, projectName, "")
+        if projectName in projectInSolutions:
+            solutionName = projectInSolutions[projectName]
+        else:
+            solutionName = "N/A"
+        for package, version in GetProjectPackages(projectFilename, projectRecord, packagesConfigRecords, centralPackageVersions):
             currentProject.Packages.append(f"{package}|{version}")
+            # package names differing only in case are the same package, so they share a column in the solution readme
+            packageName = packageIndex.Add(package, version, projectName)
             if solutionName not in solutions:
-                newsolution = Solution(solutionName)
-                newsolution.Packages.append(package)
-                solutions[solutionName] = newsolution
+                solutions[solutionName] = Solution(solutionName)
+            solutions[solutionName].Packages[packageName] = None
+            currentProject.PackageDictionary[packageName] = version
+        if projectRecord["RootNamespace"] is not None:
+            currentProject.RootNamespace = projectRecord["RootNamespace"]
+        if projectRecord["TargetFramework"] is not None:
+            currentProject.TargetFramework = projectRecord["TargetFramework"]
+        for subProjectPath, subProjectName in projectRecord["ProjectReferences"]:
+            if subProjectName in projectDictionary:
+                subProject = projectDictionary[subProjectName]
             else:
-                if package not in solutions[solutionName].Packages:
-                    solutions[solutionName].Packages.append(package)
-            currentProject.PackageDictionary[package] = version
+                # the path is '' for a project in the same folder as the project referencing it
+                subProjectFilename = f"{subProjectPath}\\{subProjectName}" if subProjectPath else os.path.join(os.path.dirname(projectFilename), subProjectName)
+                subProject = Project(subProjectFilename, subProjectName, os.path.dirname(projectFilename))
+                projectDictionary[subProjectName] = subProject
+            if subProject not in currentProject.SubProjects:
+                currentProject.SubProjects.append(subProject)
+        if currentProject.ProjectName not in projectDictionary:
+            projectDictionary[projectName] = currentProject
+    return projectInSolutions, projectDictionary, solutions, packageIndex
+
+def GroupProjectsBySolution(projectDictionary: dict, projectInSolutions: dict):
+    projectsInSolution = {}
+    for projectName in projectDictionary:
+        solutionName = ""
+        if projectName in projectInSolutions:
+            solutionName = projectInSolutions[projectName]
+        if solutionName in projectsInSolution:
+            projectsInSolution[solutionName].append(projectName)
         else:
-            match = re.match(r".*<RootNamespace>(.*?)</RootNamespace>", line, re.IGNORECASE)
-            if match:
-                currentProject.RootNamespace = match.group(1)
-            else:
-                match = re.match(r".*<(?:TargetFramework|TargetFrameworkVersion)>(.*?)</(?:TargetFramework|TargetFrameworkVersion)>", line, re.IGNORECASE)
-                if match:
-                    currentProject.TargetFramework = match.group(1)
-                else:
-                    match = re.match(r".*ProjectReference Include=\"(.*)\\(.*?)\"", line, re.IGNORECASE)
-                    if match:
-                        subProjectName = match.group(2)
-                        if subProjectName in projectDictionary:
-                            subProject = projectDictionary[subProjectName]
-                        else:
-                            subProject = Project(f"{match.group(1)}\\{subProjectName}", subProjectName, os.path.dirname(projectFilename))
-                            projectDictionary[subProjectName] = subProject
-                        if subProject not in currentProject.SubProjects:
-                            currentProject.SubProjects.append(subProject)
-        line = f.readline()
-    f.close()
-    if currentProject.ProjectName not in projectDictionary:
-        projectDictionary[projectName] = currentProject
-
-# create a readme file for each project
-fileFooter = "This file was autogenerated by the tool: [https://github.com/CoderAllan/CSharpTools/blob/master/ProjectHierarchy.py](https://github.com/CoderAllan/CSharpTools/blob/master/ProjectHierarchy.py)"
-projectsInSolution = {}
-solutionReadmeContent = {}
-solutionReadmeTOC = {}
-projectNumber = 1
-for projectName in projectDictionary:
-    projectHeader = f"Project {projectName}"
-    if projectDictionary[projectName].RootNamespace:
-        rootNameSpace = projectDictionary[projectName].RootNamespace
-    else:
-        rootNameSpace = os.path.splitext(projectName)[0]
-    projectBaseInfo = "| | |\n|-|-|\n"\
-        f"|Root namespace|{rootNameSpace}|\n"\
-        f"|Target framework| {projectDictionary[projectName].TargetFramework}|"
-    projectRoot = os.path.dirname(projectDictionary[projectName].ProjectFilename)
-    csharpFiles = [os.path.join(dp, f) for dp, dn, filenames in os.walk(projectRoot) for f in filenames if f.endswith(".cs")]
-    projectCSFilenumber = f"|Number of C# files|{len(csharpFiles)}|"
-    solutionName = ""
-    if projectName in projectInSolutions:
-        solutionName = projectInSolutions[projectName]
-    projectIncludedIn = f"|Project included in|{solutionName}|"
-    if solutionName in projectsInSolution:
-        projectsInSolution[solutionName].append(projectName)
-    else:
-        projectsInSolution[solutionName] = [projectName,]
-    packagesUsed = "|Package|Version|\n|-|-|"
-    packagesInProject = sorted(projectDictionary[projectName].Packages, key=lambda s: s.lower())
-    for package in packagesInProject:
-        packagesUsed = f"{packagesUsed}\n|{package}|"
-    projectStructure = GeneratedProjectHierarchy(projectDictionary[projectName].SubProjects, projectName, 0)
-    projectStructure = f"The following structure shows the project hierarchy:\n\n```xml\n{projectStructure}```"
-    anchor = projectName.lower().replace(' ', '-')
-
-    newFilename = projectName.replace(".csproj", "")
-    # Save the project readme file
-    if generateProjectHierarchy:
-        outputFilename = projectDictionary[projectName].ProjectFilename.replace(projectName, f"ReadMe-ProjectStructure-{newFilename}.md")
-        print(f"Generating ReadMe for project:  {projectName}, filename: {outputFilename}")
-        file = open(outputFilename, "w")
-        file.write(
-            f"# {projectHeader}\n\n"
-            f"{projectBaseInfo}\n"
-            f"{projectCSFilenumber}\n"
-            f"{projectIncludedIn}\n\n"
-            f"## Packages\n\n"
-            f"{packagesUsed}\n\n"
-            f"## Project hierarchy\n\n"
-            f"{projectStructure}\n\n"
-            f"{fileFooter}"
-        )
-        file.close()
-
-    # Save the project directed graph
-    if generateDirectedGraph:
-        directedGraph = GenerateDirectedGraph(projectDictionary[projectName].SubProjects, projectName)
-        outputFilename = projectDictionary[projectName].ProjectFilename.replace(projectName, f"ReadMe-ProjectStructure-{newFilename}.dgml")
-        print(f"Generating directed graph (dgml) for project:  {projectName}, filename: {outputFilename}")
-        file = open(outputFilename, "w")
-        file.write(
-            f"<?xml version='1.0' encoding='utf-8'?>\n"
-            f"{directedGraph}\n"
-        )
-        file.close()
-
-    if generateGraphML:
-        directedGraph = GenerateGraphML(projectDictionary[projectName].SubProjects, projectName)
-        outputFilename = projectDictionary[projectName].ProjectFilename.replace(projectName, f"ReadMe-ProjectStructure-{newFilename}.graphml")
-        print(f"Generating directed graph (GraphL) for project:  {projectName}, filename: {outputFilename}")
-        file = open(outputFilename, "w")
-        file.write(
-            f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
-            f"<graphml xmlns=\"http://graphml.graphdrawing.org/xmlns\"\n"
-            f"         xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\"\n"
-            f"         xsi:schemaLocation=\"http://graphml.graphdrawing.org/xmlns http://www.yworks.com/xml/schema/graphml/1.1/ygraphml.xsd\"\n"
-            f"         xmlns:y=\"http://www.yworks.com/xml/graphml\">\n"
-            f"    <key for=\"node\" id=\"d0\" yfiles.type=\"nodegraphics\"/>\n"
-            f"  <graph id='G' edgedefault='directed'>\n"
-            f"{directedGraph}"
-            f"  </graph>\n"
-            f"</graphml>\n"
-        )
-        file.close()
-
-    if generateImg:
-        GenerateImage(projectDictionary[projectName].SubProjects, projectName)
-
-    # Create content for solution readme
-    # we use the GitHub standard for anchors in the markdown
-    projectContent = f"## {projectHeader}<a name=\"{anchor}\"></a>\n\n"\
-        f"{projectBaseInfo}\n\n"\
-        f"{projectStructure}\n\n"
-    if solutionName in solutionReadmeContent:
-        solutionReadmeContent[solutionName] = solutionReadmeContent[solutionName] + projectContent
+            projectsInSolution[solutionName] = [projectName,]
+    return projectsInSolution
+
+def scan_workspace(root: str = ".", options: ScanOptions = None, link: bool = True):
+    # Finds, parses and links all the solutions and projects under the root folder and returns the
+    # Workspace model used by the render functions. Raises ProjectCycleError if projects reference
+    # each other in a cycle. Without link, the dependency graph is not built, which is enough for
+    # the package queries, but not for the render functions.
+    if options is None:
+        options = ScanOptions()
+    # find all solution, project and C# files under the root folder in a single pass
+    with Profiler.Stage("scan"):
+        index = ScanWorkspace(root, options.ExcludedFolders)
+    Profiler.Count("Directories scanned", len(index.CSharpFileCount))
+    Profiler.Count("C# files found", index.GetCSharpFileCount(root))
+    Profiler.Count("Solution, project and package files found", len(index.GetParsedFilenames()))
+    parseCache = None
+    if options.UseCache:
+        from ProjectCache import ParseCache
+        cacheFilename = options.CacheFilename
+        if cacheFilename is None:
+            cacheFilename = os.path.join(root, ".csharptools", "cache.sqlite")
+        parseCache = ParseCache(cacheFilename, options.CacheHash)
+    jobs = options.Jobs if options.Jobs > 0 else os.cpu_count()
+    executor = None
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        with Profiler.Stage("parse"):
+            parsedFilenames = index.GetParsedFilenames()
+            records = {filename: record for filename, record in zip(parsedFilenames, ParseFiles(parsedFilenames, ParseFile, parseCache, executor, jobs)) if record is not None}
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    workspace = Workspace(root, index)
+    workspace.Records = records
+    if parseCache is not None:
+        parseCache.Close(list(records))
+        workspace.CacheHits = parseCache.Hits
+        workspace.CacheMisses = parseCache.Misses
+    with Profiler.Stage("link"):
+        workspace.ProjectInSolutions, workspace.Projects, workspace.Solutions, workspace.PackageIndex = BuildProjectModel(index, records)
+        workspace.ProjectsInSolution = GroupProjectsBySolution(workspace.Projects, workspace.ProjectInSolutions)
+        if link:
+            workspace.Graph = DependencyGraph(workspace.Projects)
+    Profiler.Count("Projects", len(workspace.Projects))
+    if Profiler.enabled and link:
+        Profiler.Count("Project references", sum(len(children) for children in workspace.Graph.Children.values()))
+    return workspace
+
+def GetProjectHierarchies(workspace: Workspace):
+    if workspace.ProjectHierarchies is None:
+        workspace.ProjectHierarchies = GenerateShortProjectHierarchies(workspace.Graph)
+    return workspace.ProjectHierarchies
+
+def GetProjectOutputFilename(project: Project, extension: str):
+    newFilename = project.ProjectName.replace(".csproj", "")
+    return project.ProjectFilename.replace(project.ProjectName, f"ReadMe-ProjectStructure-{newFilename}.{extension}")
+
+def GetOutputFilename(workspace: Workspace, filename: str):
+    # Files that are not written beside a project are written to the root folder
+    if workspace.Root == os.curdir:
+        return filename
+    return os.path.join(workspace.Root, filename)
+
+def GetSolutionNames(workspace: Workspace):
+    # The solution groups that have a solution readme, skipping the projects that are not in a solution
+    return [solutionName for solutionName in workspace.ProjectsInSolution if solutionName != "N/A" and len(solutionName) > 0]
+
+def render_project_readmes(workspace: Workspace, projectNames: set = None, skipUnchanged: bool = False, verbose: bool = True, dependencies: bool = False):
+    # Writes a readme in markdown format beside each project file, or each of the given projects, and
+    # returns the filenames written. With skipUnchanged, files whose content did not change are not written.
+    # With dependencies, the transitive dependencies and dependents of each project are included.
+    hierarchies = GetProjectHierarchies(workspace)
+    outputFilenames = []
+    for projectName in workspace.Projects:
+        if projectNames is not None and projectName not in projectNames:
+            continue
+        project = workspace.Projects[projectName]
+        outputFilename = GetProjectOutputFilename(project, "md")
+        if verbose:
+            print(f"Generating ReadMe for project:  {projectName}, filename: {outputFilename}")
+        csharpFileCount = workspace.Index.GetCSharpFileCount(os.path.dirname(project.ProjectFilename))
+        solutionName = workspace.ProjectInSolutions.get(projectName, "")
+        if WriteOutput(outputFilename, lambda: GenerateProjectReadme(project, workspace.Graph, hierarchies, csharpFileCount, solutionName, dependencies), skipUnchanged):
+            outputFilenames.append(outputFilename)
+    return outputFilenames
+
+def render_directed_graphs(workspace: Workspace, projectNames: set = None, skipUnchanged: bool = False, verbose: bool = True):
+    # Writes a directed graph in dgml format beside each project file, or each of the given projects,
+    # and returns the filenames written. With skipUnchanged, files whose content did not change are not written.
+    outputFilenames = []
+    for projectName in workspace.Projects:
+        if projectNames is not None and projectName not in projectNames:
+            continue
+        outputFilename = GetProjectOutputFilename(workspace.Projects[projectName], "dgml")
+        if verbose:
+            print(f"Generating directed graph (dgml) for project:  {projectName}, filename: {outputFilename}")
+        if Profiler.enabled:
+            Profiler.Count("Graph nodes written", len(workspace.Graph.Nodes(projectName)))
+            Profiler.Count("Graph links written", len(workspace.Graph.Links(projectName)))
+        if WriteOutput(outputFilename, lambda: GenerateDirectedGraph(workspace.Graph, projectName), skipUnchanged):
+            outputFilenames.append(outputFilename)
+    return outputFilenames
+
+def render_graphml(workspace: Workspace, projectNames: set = None, skipUnchanged: bool = False, verbose: bool = True):
+    # Writes a directed graph in GraphML format beside each project file, or each of the given projects,
+    # and returns the filenames written. With skipUnchanged, files whose content did not change are not written.
+    outputFilenames = []
+    for projectName in workspace.Projects:
+        if projectNames is not None and projectName not in projectNames:
+            continue
+        outputFilename = GetProjectOutputFilename(workspace.Projects[projectName], "graphml")
+        if verbose:
+            print(f"Generating directed graph (GraphL) for project:  {projectName}, filename: {outputFilename}")
+        if Profiler.enabled:
+            Profiler.Count("Graph nodes written", len(workspace.Graph.Nodes(projectName)))
+            Profiler.Count("Graph links written", len(workspace.Graph.Links(projectName)))
+        if WriteOutput(outputFilename, lambda: GenerateGraphML(workspace.Graph, projectName), skipUnchanged):
+            outputFilenames.append(outputFilename)
+    return outputFilenames
+
+def render_solution_readmes(workspace: Workspace, solutionNames: set = None, skipUnchanged: bool = False, verbose: bool = True, dependencies: bool = False):
+    # Writes a readme in markdown format for each solution, or each of the given solutions, to the root
+    # folder and returns the filenames written. With skipUnchanged, files whose content did not change
+    # are not written. With dependencies, the build order of the projects in the solution is included.
+    hierarchies = GetProjectHierarchies(workspace)
+    outputFilenames = []
+    for solutionName in GetSolutionNames(workspace):
+        if solutionNames is not None and solutionName not in solutionNames:
+            continue
+        packagesUsedInSolution = []
+        if solutionName in workspace.Solutions:
+            packagesUsedInSolution = sorted(workspace.Solutions[solutionName].Packages, key=lambda s: s.lower())
+        newFilename = solutionName.replace(".sln", "")
+        outputFilename = GetOutputFilename(workspace, f"ReadMe-SolutionStructure-{newFilename}.md")
+        if verbose:
+            print(f"Generating ReadMe for solution: {solutionName}, filename: {outputFilename}")
+        if WriteOutput(outputFilename, lambda: GenerateSolutionReadme(solutionName, workspace.ProjectsInSolution[solutionName], packagesUsedInSolution, workspace.Projects, workspace.Graph, hierarchies, dependencies), skipUnchanged):
+            outputFilenames.append(outputFilename)
+    return outputFilenames
+
+# Bump this whenever the layout of ProjectDependencies.json changes
+DependenciesFormatVersion = 1
+
+def GenerateDependencyJson(workspace: Workspace):
+    # The build order, the build levels and the references, transitive dependencies and dependents of
+    # every project as JSON, generated in chunks
+    import json
+    graph = workspace.Graph
+    buildLevels = graph.BuildLevels()
+    projects = {}
+    for projectName in graph.TopologicalOrder:
+        solutionNames = workspace.ProjectInSolutions.get(projectName)
+        projects[projectName] = {
+            "filename": workspace.Projects[projectName].ProjectFilename,
+            "solutions": solutionNames.split(", ") if solutionNames else [],
+            "buildLevel": graph.BuildLevel(projectName),
+            "references": graph.Children[projectName],
+            "dependencies": graph.Dependencies(projectName),
+            "dependents": graph.Dependents(projectName)
+        }
+    dependencies = {
+        "formatVersion": DependenciesFormatVersion,
+        "buildOrder": graph.TopologicalOrder,
+        "buildLevels": buildLevels,
+        "criticalPathLength": len(buildLevels),
+        "projects": projects
+    }
+    yield from json.JSONEncoder(indent=1).iterencode(dependencies)
+    yield "\n"
+
+def render_dependencies(workspace: Workspace, skipUnchanged: bool = False, verbose: bool = True):
+    # Writes the dependencies of all the projects to ProjectDependencies.json in the root folder and
+    # returns the filenames written
+    outputFilename = GetOutputFilename(workspace, "ProjectDependencies.json")
+    if verbose:
+        print(f"Generating project dependencies, filename: {outputFilename}")
+    if WriteOutput(outputFilename, lambda: GenerateDependencyJson(workspace), skipUnchanged):
+        return [outputFilename]
+    return []
+
+def render_export(workspace: Workspace, skipUnchanged: bool = False, verbose: bool = True):
+    # Writes the project graph and the packages of the whole workspace to WorkspaceGraph.jsonl in the
+    # root folder and returns the filenames written
+    from WorkspaceExport import GenerateWorkspaceExport
+    outputFilename = GetOutputFilename(workspace, "WorkspaceGraph.jsonl")
+    if verbose:
+        print(f"Generating workspace export, filename: {outputFilename}")
+    if WriteOutput(outputFilename, lambda: GenerateWorkspaceExport(workspace), skipUnchanged):
+        return [outputFilename]
+    return []
+
+class ImageToolsNotFoundError(Exception):
+    pass
+
+def FindImageTools():
+    # Returns the path of the Graphviz dot program after verifying that pydot and Graphviz are installed
+    from importlib import util
+    if util.find_spec('pydot') is None:
+        raise ImageToolsNotFoundError("Required package 'pydot' not found. Please install pydot using 'pip install pydot'")
+    import shutil
+    dotExecutable = shutil.which("dot")
+    if dotExecutable is None:
+        raise ImageToolsNotFoundError("Required program not found. Please download and install Graphviz from: https://graphviz.gitlab.io/_pages/Download/Download_windows.html ")
+    return dotExecutable
+
+def render_images(workspace: Workspace, outputFormat: str = "png", combined: bool = False, jobs: int = 0, dotExecutable: str = None, projectNames: set = None, solutionNames: set = None, verbose: bool = True):
+    # Renders the project graphs to images in the root folder using Graphviz, either one image for each
+    # project or, when combined is set, one image for each solution. The images can be limited to the
+    # given projects or solutions. Returns the ImageRenderer used, which holds the number of images
+    # generated, unchanged and failed and the names of the generated files.
+    if dotExecutable is None:
+        dotExecutable = FindImageTools()
+    from ImageRenderer import ImageRenderer
+    if jobs <= 0:
+        jobs = os.cpu_count()
+    imageRenderer = ImageRenderer(dotExecutable, outputFormat, jobs, os.path.join(workspace.Root, ".csharptools", "images.json"), verbose)
+    if combined:
+        for solutionName in GetSolutionNames(workspace):
+            if solutionNames is not None and solutionName not in solutionNames:
+                continue
+            links = {}
+            for projectName in workspace.ProjectsInSolution[solutionName]:
+                links.update(dict.fromkeys(workspace.Graph.Links(projectName)))
+            if len(links) > 0:
+                newFilename = solutionName.replace(".sln", "")
+                imageRenderer.Add(GetOutputFilename(workspace, f"{newFilename}.{outputFormat}"), list(links))
     else:
-        solutionReadmeContent[solutionName] = projectContent
-    if projectDictionary[projectName].RootNamespace:
-        rootNameSpace = projectDictionary[projectName].RootNamespace
+        for projectName in workspace.Projects:
+            if projectNames is not None and projectName not in projectNames:
+                continue
+            links = list(workspace.Graph.Links(projectName))
+            if len(links) > 0:
+                imageRenderer.Add(GetOutputFilename(workspace, f"{projectName}.{outputFormat}"), links)
+    with Profiler.Stage("graphviz"):
+        imageRenderer.Render()
+    Profiler.Count("Images generated", imageRenderer.Rendered)
+    Profiler.Count("Images unchanged", imageRenderer.Unchanged)
+    Profiler.Count("Images failed", imageRenderer.Failed)
+    if verbose:
+        print(f"Images: {imageRenderer.Rendered} generated, {imageRenderer.Unchanged} unchanged, {imageRenderer.Failed} failed")
+    return imageRenderer
+
+def GeneratePackageUsages(workspace: Workspace, usages: dict):
+    # One line for each version with the projects using it and the solutions they are included in
+    for version in usages:
+        projects = []
+        for projectName in usages[version]:
+            solutionName = workspace.ProjectInSolutions.get(projectName)
+            projects.append(f"{projectName} ({solutionName})" if solutionName else projectName)
+        yield f"    {version}: {', '.join(projects)}\n"
+
+def GeneratePackageConflictReport(workspace: Workspace):
+    # Lists the packages used in more than one version in the workspace
+    conflicts = workspace.PackageIndex.GetConflicts()
+    if len(conflicts) == 0:
+        yield "No packages are used in more than one version\n"
+        return
+    yield f"Packages used in more than one version: {len(conflicts)}\n"
+    for package, usages in conflicts:
+        yield f"\n{package}\n"
+        yield from GeneratePackageUsages(workspace, usages)
+
+def GeneratePackageUsageReport(workspace: Workspace, package: str):
+    # Lists the projects using each version of the package
+    usages = workspace.PackageIndex.GetUsages(package)
+    if usages is None:
+        yield f"No projects use the package {package}\n"
+        return
+    yield f"Projects using {workspace.PackageIndex.Names[package.lower()]}:\n"
+    yield from GeneratePackageUsages(workspace, usages)
+
+class RenderOptions:
+    __slots__ = ("ProjectReadmes", "DirectedGraphs", "GraphML", "SolutionReadmes", "Images", "ImageFormat", "CombinedImage", "ImageJobs", "DotExecutable", "Dependencies", "Export")
+
+    def __init__(self, projectReadmes: bool = False, directedGraphs: bool = False, graphML: bool = False, solutionReadmes: bool = True, images: bool = False, imageFormat: str = "png", combinedImage: bool = False, imageJobs: int = 0, dotExecutable: str = None, dependencies: bool = False, export: bool = False):
+        self.ProjectReadmes = projectReadmes
+        self.DirectedGraphs = directedGraphs
+        self.GraphML = graphML
+        self.SolutionReadmes = solutionReadmes
+        self.Images = images
+        self.ImageFormat = imageFormat
+        self.CombinedImage = combinedImage
+        self.ImageJobs = imageJobs
+        self.DotExecutable = dotExecutable
+        # Include the dependencies in the readmes and write them to ProjectDependencies.json
+        self.Dependencies = dependencies
+        # Write the project graph of the whole workspace to WorkspaceGraph.jsonl
+        self.Export = export
+
+def render_workspace(workspace: Workspace, renderOptions: RenderOptions, projectNames: set = None, solutionNames: set = None, skipUnchanged: bool = False, verbose: bool = True):
+    # Writes all the files selected by the render options, optionally only for the given projects and
+    # solutions, and returns the names of the files written
+    outputFilenames = []
+    if renderOptions.ProjectReadmes:
+        with Profiler.Stage("render project readmes"):
+            outputFilenames.extend(render_project_readmes(workspace, projectNames, skipUnchanged, verbose, renderOptions.Dependencies))
+    if renderOptions.DirectedGraphs:
+        with Profiler.Stage("render dgml"):
+            outputFilenames.extend(render_directed_graphs(workspace, projectNames, skipUnchanged, verbose))
+    if renderOptions.GraphML:
+        with Profiler.Stage("render graphml"):
+            outputFilenames.extend(render_graphml(workspace, projectNames, skipUnchanged, verbose))
+    if renderOptions.SolutionReadmes:
+        with Profiler.Stage("render solution readmes"):
+            outputFilenames.extend(render_solution_readmes(workspace, solutionNames, skipUnchanged, verbose, renderOptions.Dependencies))
+    if renderOptions.Dependencies:
+        with Profiler.Stage("render dependencies"):
+            outputFilenames.extend(render_dependencies(workspace, skipUnchanged, verbose))
+    if renderOptions.Export:
+        with Profiler.Stage("render export"):
+            outputFilenames.extend(render_export(workspace, skipUnchanged, verbose))
+    if renderOptions.Images:
+        with Profiler.Stage("render images"):
+            imageRenderer = render_images(workspace, renderOptions.ImageFormat, renderOptions.CombinedImage, renderOptions.ImageJobs, renderOptions.DotExecutable, projectNames, solutionNames, verbose)
+        outputFilenames.extend(imageRenderer.RenderedFilenames)
+    return outputFilenames
+
+def GetFileStats(filenames: list):
+    # The modification time and size of each of the files that exist
+    fileStats = {}
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            continue
+        fileStats[filename] = (stat.st_mtime_ns, stat.st_size)
+    return fileStats
+
+def update_workspace(workspace: Workspace, options: ScanOptions, fileStats: dict, rescan: bool):
+    # Brings the workspace up to date with the solution, project and package files on disk, parsing only the
+    # files whose modification time or size differ from fileStats. With rescan, the directory tree is
+    # scanned again to find new files and changes in the number of C# files. Returns the updated
+    # workspace, the new file stats, the projects whose files may have changed and the solutions
+    # whose readme may have changed. Raises ProjectCycleError if the change introduced a cycle.
+    index = workspace.Index
+    if rescan:
+        index = ScanWorkspace(workspace.Root, options.ExcludedFolders)
+    newFileStats = GetFileStats(index.GetParsedFilenames())
+    if not rescan and len(newFileStats) < len(index.GetParsedFilenames()):
+        # a file was deleted
+        index = ScanWorkspace(workspace.Root, options.ExcludedFolders)
+        newFileStats = GetFileStats(index.GetParsedFilenames())
+
+    records = dict(workspace.Records)
+    changedFilenames = [filename for filename in records if filename not in newFileStats]
+    for filename in changedFilenames:
+        del records[filename]
+    for filename in newFileStats:
+        if fileStats.get(filename) != newFileStats[filename]:
+            try:
+                records[filename] = ParseFile(filename)
+                changedFilenames.append(filename)
+            except OSError:
+                # the file is being replaced, try again on the next update
+                del newFileStats[filename]
+
+    changedProjects = set(os.path.basename(filename) for filename in changedFilenames if filename.endswith(".csproj"))
+    solutionsChanged = any(filename.endswith(".sln") for filename in changedFilenames)
+    # the projects using a changed packages.config or Directory.Packages.props
+    changedPackageFolders = [os.path.dirname(filename) for filename in changedFilenames if filename in index.PackagesConfigFilenames or filename in index.PackagesPropsFilenames or filename in workspace.Index.PackagesConfigFilenames or filename in workspace.Index.PackagesPropsFilenames]
+    for projectName in workspace.Projects:
+        projectFolder = os.path.dirname(workspace.Projects[projectName].ProjectFilename)
+        if any(projectFolder == folder or projectFolder.startswith(folder + os.sep) for folder in changedPackageFolders):
+            changedProjects.add(projectName)
+    if rescan:
+        for projectName in workspace.Projects:
+            projectRoot = os.path.dirname(workspace.Projects[projectName].ProjectFilename)
+            if index.GetCSharpFileCount(projectRoot) != workspace.Index.GetCSharpFileCount(projectRoot):
+                changedProjects.add(projectName)
+    if len(changedProjects) == 0 and not solutionsChanged:
+        workspace.Index = index
+        return workspace, newFileStats, set(), set()
+
+    newWorkspace = Workspace(workspace.Root, index)
+    newWorkspace.Records = records
+    newWorkspace.ProjectInSolutions, newWorkspace.Projects, newWorkspace.Solutions, newWorkspace.PackageIndex = BuildProjectModel(index, records)
+    newWorkspace.ProjectsInSolution = GroupProjectsBySolution(newWorkspace.Projects, newWorkspace.ProjectInSolutions)
+    newWorkspace.Graph = DependencyGraph(newWorkspace.Projects)
+    changedProjects.update(set(newWorkspace.Projects).symmetric_difference(workspace.Projects))
+    if solutionsChanged:
+        for projectName in newWorkspace.Projects:
+            if newWorkspace.ProjectInSolutions.get(projectName) != workspace.ProjectInSolutions.get(projectName):
+                changedProjects.add(projectName)
+    affectedProjects = newWorkspace.Graph.ReverseClosure(changedProjects)
+    newWorkspace.Graph.ReuseResults(workspace.Graph, affectedProjects)
+    changedSolutions = set()
+    for solutionName in newWorkspace.ProjectsInSolution:
+        projectNames = newWorkspace.ProjectsInSolution[solutionName]
+        if projectNames != workspace.ProjectsInSolution.get(solutionName) or not affectedProjects.isdisjoint(projectNames):
+            changedSolutions.add(solutionName)
+    return newWorkspace, newFileStats, affectedProjects, changedSolutions
+
+def watch_workspace(workspace: Workspace, options: ScanOptions, renderOptions: RenderOptions, interval: float = 0.5, rescanInterval: float = 10):
+    # Polls the solution, project and package files for changes every interval seconds and updates the files of the
+    # projects and solutions affected by a change. Files whose content did not change are not written.
+    # The directory tree is scanned for new files every rescanInterval seconds. Runs until interrupted.
+    import time
+    fileStats = GetFileStats(list(workspace.Records))
+    print(f"Watching {len(fileStats)} solution, project and package files for changes. Press Ctrl+C to stop.")
+    lastRescan = time.monotonic()
+    lastError = None
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            rescan = time.monotonic() - lastRescan >= rescanInterval
+            if rescan:
+                lastRescan = time.monotonic()
+            previousWorkspace = workspace
+            try:
+                with Profiler.Stage("update workspace"):
+                    workspace, fileStats, affectedProjects, changedSolutions = update_workspace(workspace, options, fileStats, rescan)
+            except ProjectCycleError as error:
+                if str(error) != lastError:
+                    print(f"Circular project reference found: {error}")
+                    lastError = str(error)
+                continue
+            lastError = None
+            if len(affectedProjects) == 0 and len(changedSolutions) == 0:
+                continue
+            renderedProjects = affectedProjects
+            if renderOptions.Dependencies:
+                # the dependents listed in the readmes of the projects the affected projects depend on, before
+                # and after the change, may have changed as well
+                renderedProjects = set(affectedProjects)
+                for projectName in affectedProjects:
+                    renderedProjects.update(workspace.Graph.Dependencies(projectName))
+                    if projectName in previousWorkspace.Graph.Children:
+                        renderedProjects.update(previousWorkspace.Graph.Dependencies(projectName))
+            outputFilenames = render_workspace(workspace, renderOptions, renderedProjects, changedSolutions, True, False)
+            if len(outputFilenames) == 0:
+                continue
+            for outputFilename in outputFilenames:
+                print(f"Updated: {outputFilename}")
+            print(f"{len(affectedProjects)} projects affected, {len(outputFilenames)} files updated in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+
+def PrintCacheStatistics(workspace: Workspace):
+    if workspace.CacheHits is not None:
+        print(f"Parse cache: {workspace.CacheHits} hits, {workspace.CacheMisses} misses")
+
+def RunTool(args):
+    if args.pydotformat not in pyDotFormats:
+        print(f"Illegal argument specified for parameter --pydotformat (-f): {args.pydotformat}")
+        exit()
+    dotExecutable = None
+    if args.generateimage and not args.report_conflicts and args.whouses is None and not args.exportonly:
+        try:
+            dotExecutable = FindImageTools()
+        except ImageToolsNotFoundError as error:
+            print("Fatal error!")
+            print(error)
+            exit()
+
+    options = ScanOptions(defaultExcludedFolders, args.cache, args.cachefile, args.cachehash, args.jobs)
+    # the package queries are answered from the package index, without linking the projects
+    packageQuery = args.report_conflicts or args.whouses is not None
+    try:
+        workspace = scan_workspace(".", options, not packageQuery)
+    except ProjectCycleError as error:
+        print("Fatal error!")
+        print(f"Circular project reference found: {error}")
+        exit()
+
+    if packageQuery:
+        if args.report_conflicts:
+            print("".join(GeneratePackageConflictReport(workspace)), end="")
+        if args.whouses is not None:
+            print("".join(GeneratePackageUsageReport(workspace, args.whouses)), end="")
+        PrintCacheStatistics(workspace)
+        return
+
+    if args.exportonly:
+        renderOptions = RenderOptions(solutionReadmes=False, export=True)
     else:
-        rootNameSpace = os.path.splitext(projectName)[0]
+        renderOptions = RenderOptions(args.generateprojecthierarchy, args.generatedirectedgraph, args.generategraphml, args.generatesolutionreadme, args.generateimage, args.pydotformat, args.combinedimage, args.imagejobs, dotExecutable, args.dependencies, args.export)
+    render_workspace(workspace, renderOptions)
+
+    PrintCacheStatistics(workspace)
+
+    if args.watch:
+        watch_workspace(workspace, options, renderOptions, args.watchinterval, args.rescaninterval)
 
-    tocEntry = f"|[{projectName}](#{anchor})|{rootNameSpace}|{projectDictionary[projectName].TargetFramework}|\n"
-    if solutionName in solutionReadmeTOC:
-        solutionReadmeTOC[solutionName] = solutionReadmeTOC[solutionName] + tocEntry
+def main():
+    parser = argparse.ArgumentParser("python ProjectHierarchy.py", description="Tool for visualizing the project hierarchy for a C# solution.")
+    parser.add_argument("-ph", "--generateprojecthierarchy", default=False, help="Generate project hierarchy in xml format for each cs-project file", action="store_true")
+    parser.add_argument("-sr", "--generatesolutionreadme", default=True, help="Generate solution readme in markdown format for each solution file", action="store_true")
+    parser.add_argument("-dg", "--generatedirectedgraph", default=False, help="Generate directed graph in dgml format for each cs-project file", action="store_true")
+    parser.add_argument("-gm", "--generategraphml", default=False, help="Generate directed graph  in GraphML (xml) format for each cs-project file", action="store_true")
+    parser.add_argument("-img", "--generateimage", default=False, help="Generate directed graph in PNG format for each cs-project file. The format can be changed by the -f parameter", action="store_true")
+    parser.add_argument("-f", "--pydotformat", default="png", help="Specifies the image output format. Valid formats: dia, dot, gd, gif, jpg, pdf, png, ps, svg, vml", type=str)
+    parser.add_argument("-ci", "--combinedimage", default=False, help="Generate one image of the combined project graph for each solution file instead of one image for each cs-project file", action="store_true")
+    parser.add_argument("--imagejobs", default=0, help="Number of Graphviz processes used concurrently for generating images. Default: one per CPU", type=int)
+    parser.add_argument("-dp", "--dependencies", default=False, help="Include the transitive dependencies, dependent projects and build order in the readmes and write them to ProjectDependencies.json", action="store_true")
+    parser.add_argument("-ex", "--export", default=False, help="Write the project graph and the packages of the whole workspace to WorkspaceGraph.jsonl", action="store_true")
+    parser.add_argument("--exportonly", default=False, help="Only write WorkspaceGraph.jsonl, without the readmes and the graph files of the projects and solutions", action="store_true")
+    parser.add_argument("-c", "--cache", default=False, help="Cache the parsed solution and project files on disk and only parse the files that changed since the last run", action="store_true")
+    parser.add_argument("--cachefile", default=None, help="The file used for the cache of parsed files. Default: .csharptools/cache.sqlite", type=str)
+    parser.add_argument("--cachehash", default=False, help="Validate the cached files by their content hash in addition to their modification time and size", action="store_true")
+    parser.add_argument("-j", "--jobs", default=1, help="Number of processes used for parsing the project files. Use 0 to use one process per CPU. Default: 1", type=int)
+    parser.add_argument("-w", "--watch", default=False, help="Keep running and update the generated files of the projects and solutions affected when a solution or project file changes", action="store_true")
+    parser.add_argument("--watchinterval", default=0.5, help="Number of seconds between checking the solution and project files for changes in watch mode. Default: 0.5", type=float)
+    parser.add_argument("--rescaninterval", default=10, help="Number of seconds between scanning the directory tree for new files in watch mode. Default: 10", type=float)
+    parser.add_argument("--report-conflicts", default=False, help="Only list the packages used in more than one version and the projects using each version, without generating any files", action="store_true")
+    parser.add_argument("--whouses", default=None, help="Only list the projects using each version of the package, without generating any files", type=str)
+    parser.add_argument("--profile", default=False, help="Print the time spent in each stage of the run and counters like the number of files parsed and written, and write them to a trace file", action="store_true")
+    parser.add_argument("--profiletrace", default=os.path.join(".csharptools", "profile-trace.json"), help="The trace file written by --profile, which can be opened in chrome://tracing or ui.perfetto.dev. Default: .csharptools/profile-trace.json", type=str)
+    parser.add_argument("--cprofile", default=None, help="Run the tool with the cProfile profiler, print the slowest functions and save the profile to this file", type=str)
+    args = parser.parse_args()
+
+    if args.profile:
+        Profiler.Enable()
+    if args.cprofile is not None:
+        import cProfile
+        import pstats
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            RunTool(args)
+        finally:
+            profile.disable()
+            profile.dump_stats(args.cprofile)
+            pstats.Stats(profile).sort_stats("cumulative").print_stats(25)
     else:
-        solutionReadmeTOC[solutionName] = f"|Project|Root namespace|Target framework|\n|-|-|-|\n{tocEntry}"
-    projectNumber = projectNumber + 1
-
-# create a readme file for each solution file
-if generateSolutionReadme:
-    for solutionName in solutionReadmeContent:
-        if solutionName != "N/A" and len(solutionName) > 0:
-            packagesUsedInSolution = sorted(solutions[solutionName].Packages, key=lambda s: s.lower())
-            packageTableSeperator = "|-"
-            packageTableHeader = "|Project"
-            packageTableBody = ""
-            for package in packagesUsedInSolution:
-                packageTableHeader = f"{packageTableHeader}|{package}"
-                packageTableSeperator = f"{packageTableSeperator}|-"
-            for projectName in projectsInSolution[solutionName]:
-                packages = projectDictionary[projectName].Packages
-                packageTableBody = f"{packageTableBody}|{projectName}"
-                for package in packagesUsedInSolution:
-                    if package in projectDictionary[projectName].PackageDictionary:
-                        packageTableBody = f"{packageTableBody}|{projectDictionary[projectName].PackageDictionary[package]}"
-                    else:
-                        packageTableBody = f"{packageTableBody}|"
-                packageTableBody = f"{packageTableBody}|\n"
-            packageTable = f"{packageTableHeader}|\n{packageTableSeperator}|\n{packageTableBody}|\n\n"
-            newFilename = solutionName.replace(".sln", "")
-            outputFilename = f"ReadMe-SolutionStructure-{newFilename}.md"
-            print(f"Generating ReadMe for solution: {solutionName}, filename: {outputFilename}")
-            file = open(outputFilename, "w")
-            file.write(
-                f"# {solutionName}\n\n"
-                f"## Projects\n\n{solutionReadmeTOC[solutionName]}\n"
-                f"## Packages\n\n"
-                f"{packageTable}"
-                f"{solutionReadmeContent[solutionName]}"
-                f"{fileFooter}"
-            )
-            file.close()
+        RunTool(args)
+    if args.profile:
+        print("".join(Profiler.GenerateSummary()), end="")
+        Profiler.WriteTrace(args.profiletrace)
+        print(f"Profile trace written to {args.profiletrace}")
+
+if __name__ == "__main__":
+    main()
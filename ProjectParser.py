@@ -0,0 +1,167 @@
+# Parsing of Visual Studio solution (.sln) and C# project (.csproj) files and of
+# the NuGet package files next to them (packages.config and Directory.Packages.props).
+#
+# The parse functions only read the file and return a plain record (a dict of
+# strings and lists) with the information found in it. Linking the projects
+# together is done by the caller, which means the records can be cached on
+# disk and produced in any order.
+#
+# Each file is read once as bytes and scanned by a single precompiled pattern
+# that only stops at the elements of interest, instead of trying several
+# patterns on every line. The scan does not require the file to be well-formed
+# XML, so files that an XML parser would reject are still read, and elements
+# spanning several lines, like a PackageReference with a Version child element,
+# are found as well.
+
+import re
+import Profiler
+
+# The elements of interest and comments, which are skipped. Group 1 is '/' for an end tag,
+# group 2 is the element name and group 3 holds the attributes.
+elementPattern = re.compile(rb"<!--.*?-->|<(/?)(PackageReference|ProjectReference|Reference|RootNamespace|TargetFrameworkVersion|TargetFrameworks|TargetFramework|VersionOverride|Version|PackageVersion|package)\b([^>]*)>", re.IGNORECASE | re.DOTALL)
+attributePattern = re.compile(rb"([\w.:-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+# Project("{type}") = "name", "path\name.csproj", "{guid}"
+solutionProjectPattern = re.compile(rb"^\s*Project\(\"[^\"]*\"\)\s*=\s*\"[^\"]*\"\s*,\s*\"([^\"]*\.csproj)\"", re.IGNORECASE | re.MULTILINE)
+
+def ReadFile(filename: str):
+    # The content of the file as UTF-8 encoded bytes
+    with open(filename, "rb") as f:
+        data = f.read()
+    if data.startswith(b"\xff\xfe") or data.startswith(b"\xfe\xff"):
+        data = data.decode("utf-16").encode("utf-8")
+    Profiler.Count("Bytes read", len(data))
+    return data
+
+def Decode(value: bytes):
+    return value.decode("utf-8", "replace")
+
+def ParseAttributes(attributes: bytes):
+    # The attributes of an element by lower case name
+    result = {}
+    for name, doubleQuoted, singleQuoted in attributePattern.findall(attributes):
+        result[Decode(name).lower()] = Decode(doubleQuoted or singleQuoted)
+    return result
+
+def ReadElementText(data: bytes, match):
+    # The text of the element started by match, or None if the element has no text
+    if match.group(3).endswith(b"/"):
+        return None
+    end = data.find(b"<", match.end())
+    if end < 0:
+        return None
+    return Decode(data[match.end():end].strip())
+
+def SplitReferencePath(include: str):
+    # Split 'path\name.csproj' into the path and the filename. The path is '' for a file in the same folder.
+    separator = max(include.rfind("\\"), include.rfind("/"))
+    if separator < 0:
+        return ["", include]
+    return [include[:separator], include[separator + 1:]]
+
+def ParseSolutionFile(solutionFilename: str):
+    # The record contains the names of the project files included in the solution
+    projects = []
+    for projectPath in solutionProjectPattern.findall(ReadFile(solutionFilename)):
+        projects.append(SplitReferencePath(Decode(projectPath))[1])
+    Profiler.Count("Pattern matches", len(projects))
+    return {"Projects": projects}
+
+def ParseProjectFile(projectFilename: str):
+    # RootNamespace and TargetFramework are None when the project file does not specify them.
+    # Packages holds [package, version] pairs and ProjectReferences holds [path, filename]
+    # pairs, both in the order they appear in the project file. The version of a package
+    # is None when it is defined centrally in Directory.Packages.props.
+    record = {
+        "Packages": [],
+        "RootNamespace": None,
+        "TargetFramework": None,
+        "ProjectReferences": []
+    }
+    data = ReadFile(projectFilename)
+    targetFrameworks = None
+    # the PackageReference element whose Version child element has not been read yet
+    packageReference = None
+    matchCount = 0
+    for matchCount, match in enumerate(elementPattern.finditer(data), 1):
+        name = match.group(2)
+        if name is None:
+            continue
+        name = name.lower()
+        if match.group(1):
+            if name == b"packagereference":
+                packageReference = None
+        elif name == b"packagereference":
+            attributes = ParseAttributes(match.group(3))
+            if "include" in attributes:
+                package = [attributes["include"], attributes.get("versionoverride", attributes.get("version"))]
+                record["Packages"].append(package)
+                if not match.group(3).endswith(b"/"):
+                    packageReference = package
+        elif name == b"reference":
+            # assembly reference of a legacy project, e.g. Include="EntityFramework, Version=6.0.0.0, Culture=neutral"
+            attributes = ParseAttributes(match.group(3))
+            if "include" in attributes:
+                parts = attributes["include"].split(",")
+                version = attributes.get("version")
+                for part in parts[1:]:
+                    key, separator, value = part.partition("=")
+                    if key.strip().lower() == "version":
+                        version = value.strip()
+                if version is not None:
+                    record["Packages"].append([parts[0].strip(), version])
+        elif name == b"version" or name == b"versionoverride":
+            if packageReference is not None:
+                version = ReadElementText(data, match)
+                if version is not None and (name == b"versionoverride" or packageReference[1] is None):
+                    packageReference[1] = version
+        elif name == b"rootnamespace":
+            text = ReadElementText(data, match)
+            if text is not None:
+                record["RootNamespace"] = text
+        elif name == b"targetframework" or name == b"targetframeworkversion":
+            text = ReadElementText(data, match)
+            if text is not None:
+                record["TargetFramework"] = text
+        elif name == b"targetframeworks":
+            targetFrameworks = ReadElementText(data, match)
+        elif name == b"projectreference":
+            attributes = ParseAttributes(match.group(3))
+            if "include" in attributes:
+                record["ProjectReferences"].append(SplitReferencePath(attributes["include"]))
+    if record["TargetFramework"] is None and targetFrameworks is not None:
+        record["TargetFramework"] = targetFrameworks
+    Profiler.Count("Pattern matches", matchCount)
+    return record
+
+def ParsePackagesConfigFile(packagesFilename: str):
+    # The record contains the [package, version] pairs of the NuGet packages used by the
+    # legacy project in the same folder
+    packages = []
+    for match in elementPattern.finditer(ReadFile(packagesFilename)):
+        if match.group(2) is not None and match.group(2).lower() == b"package" and not match.group(1):
+            attributes = ParseAttributes(match.group(3))
+            if "id" in attributes:
+                packages.append([attributes["id"], attributes.get("version", "")])
+    return {"Packages": packages}
+
+def ParsePackagesPropsFile(propsFilename: str):
+    # The record contains the [package, version] pairs of the centrally managed package
+    # versions used by the projects in the folder and its subfolders
+    packageVersions = []
+    for match in elementPattern.finditer(ReadFile(propsFilename)):
+        if match.group(2) is not None and match.group(2).lower() == b"packageversion" and not match.group(1):
+            attributes = ParseAttributes(match.group(3))
+            if "include" in attributes and "version" in attributes:
+                packageVersions.append([attributes["include"], attributes["version"]])
+    return {"PackageVersions": packageVersions}
+
+def ParseFile(filename: str):
+    # Parse any of the files found in the workspace, chosen by the name of the file
+    lowerFilename = filename.lower()
+    if lowerFilename.endswith(".sln"):
+        return ParseSolutionFile(filename)
+    if lowerFilename.endswith("packages.config"):
+        return ParsePackagesConfigFile(filename)
+    if lowerFilename.endswith("directory.packages.props"):
+        return ParsePackagesPropsFile(filename)
+    return ParseProjectFile(filename)
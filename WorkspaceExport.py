@@ -0,0 +1,65 @@
+# Export of the project graph of the whole workspace to a single JSON Lines file.
+#
+# Every line of the file is a JSON object with a "type". The file starts with a
+# header, followed by the packages, the solutions and the projects. Packages,
+# solutions and projects are numbered, and the projects refer to each other and
+# to their packages and solutions by number. The projects are written in build
+# order, so a project only refers to projects written before it. Tools that need
+# the project graph can read this one file instead of the dgml and GraphML files
+# written for every project.
+
+import json
+
+# Bump this whenever the layout of the export changes
+ExportFormatVersion = 1
+
+def GenerateWorkspaceExport(workspace):
+    # The lines of the export of the workspace, a ProjectHierarchy.Workspace
+    encoder = json.JSONEncoder(separators=(",", ":"))
+    graph = workspace.Graph
+    packageIds = {}
+    for projectName in graph.TopologicalOrder:
+        for package in workspace.Projects[projectName].PackageDictionary:
+            if package not in packageIds:
+                packageIds[package] = len(packageIds)
+    solutionIds = {}
+    for projectName in graph.TopologicalOrder:
+        solutionNames = workspace.ProjectInSolutions.get(projectName)
+        if solutionNames:
+            for solutionName in solutionNames.split(", "):
+                if solutionName not in solutionIds:
+                    solutionIds[solutionName] = len(solutionIds)
+    projectIds = {projectName: i for i, projectName in enumerate(graph.TopologicalOrder)}
+
+    yield encoder.encode({"type": "header", "formatVersion": ExportFormatVersion, "packages": len(packageIds), "solutions": len(solutionIds), "projects": len(projectIds)}) + "\n"
+    for package in packageIds:
+        yield encoder.encode({"type": "package", "id": packageIds[package], "name": package}) + "\n"
+    for solutionName in solutionIds:
+        yield encoder.encode({"type": "solution", "id": solutionIds[solutionName], "name": solutionName}) + "\n"
+    for projectName in graph.TopologicalOrder:
+        project = workspace.Projects[projectName]
+        solutionNames = workspace.ProjectInSolutions.get(projectName)
+        yield encoder.encode({
+            "type": "project",
+            "id": projectIds[projectName],
+            "name": projectName,
+            "filename": project.ProjectFilename,
+            "rootNamespace": project.RootNamespace,
+            "targetFramework": project.TargetFramework,
+            "solutions": [solutionIds[solutionName] for solutionName in solutionNames.split(", ")] if solutionNames else [],
+            "references": [projectIds[childName] for childName in graph.Children[projectName]],
+            "packages": [[packageIds[package], version] for package, version in project.PackageDictionary.items()]
+        }) + "\n"
+
+def ReadWorkspaceExport(filename: str):
+    # Reads an export written by GenerateWorkspaceExport. Returns a dict with the lists "packages",
+    # "solutions" and "projects", where the position of each entry in its list is its id.
+    export = {"packages": [], "solutions": [], "projects": []}
+    with open(filename, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("type") != "header" or header.get("formatVersion") != ExportFormatVersion:
+            raise ValueError(f"{filename} is not a workspace export of format version {ExportFormatVersion}")
+        for line in f:
+            entry = json.loads(line)
+            export[entry.pop("type") + "s"].append(entry)
+    return export